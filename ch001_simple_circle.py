@@ -1,6 +1,7 @@
-import numpy as np
 import tcod
 import sys
+import tcodplus.draw as tcp_draw
+import tcodplus.assets as assets
 
 
 def main():
@@ -27,23 +28,8 @@ def main():
         r += 0 if r+dr < 0 else dr
 
 
-# Is con garbage collected ?
 def draw_circle(dest, x, y, c, r):
-    diam = 2*r + 1
-    center_x = center_y = r
-    min_dist = (r-1)**2 - 1
-    max_dist = r**2
-    mgrid = np.mgrid[:diam, :diam]
-    distance_array = (mgrid[0]-center_x)**2 + (mgrid[1]-center_y)**2
-
-    truth_circle = (min_dist < distance_array)*(distance_array < max_dist)
-
-    con = tcod.console_new(diam, diam)
-    con.bg[:] = tcod.black
-    con.fg[:] = tcod.white
-    con.ch[:] = truth_circle.choose([ord(" "), ord(c)])
-
-    con.blit(dest, x-center_x, y-center_y, 0, 0, diam, diam)
+    tcp_draw.circle(dest, x, y, r, c, fg=tcod.white, bg=tcod.black)
 
 
 def handle_key():
@@ -64,7 +50,7 @@ def init_root(w, h):
         "fontFile": "data/fonts/dejavu10x10_gs_tc.png",
         "flags": tcod.FONT_TYPE_GREYSCALE | tcod.FONT_LAYOUT_TCOD
     }
-    tcod.console_set_custom_font(**params)
+    assets.manager.font(params["fontFile"], params["flags"])
 
     params = {
         "w": w,
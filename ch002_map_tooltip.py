@@ -1,4 +1,5 @@
 import tcod
+import tcodplus.assets as assets
 
 country_color = {
     (236, 200, 77): "W. Europe",
@@ -19,7 +20,7 @@ def main():
     canvas = tcod.console_new(width, height)
 
     img_path = "data/img/map-of-europe-clipart.bmp"
-    img = tcod.image_load(img_path)
+    img = assets.manager.image(img_path)
 
     img_x, img_y = width//2, height//2
     img_scale = 0.1
@@ -61,7 +62,7 @@ def add_label(dest, x, y, country_name):
 def init_root(w, h):
     font = "data/fonts/dejavu10x10_gs_tc.png"
     flags = tcod.FONT_TYPE_GREYSCALE | tcod.FONT_LAYOUT_TCOD
-    tcod.console_set_custom_font(font, flags)
+    assets.manager.font(font, flags)
     return tcod.console_init_root(w, h, "Challenge 2 : interactive ASCII map", False)
 
 
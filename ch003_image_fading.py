@@ -1,4 +1,5 @@
 import tcod
+import tcodplus.assets as assets
 import math
 
 
@@ -11,9 +12,9 @@ def main():
     canvas1 = tcod.console_new(width, height)
     canvas2 = tcod.console_new(width, height)
 
-    img1 = tcod.image_load("data/img/map-of-europe-clipart.bmp")
+    img1 = assets.manager.image("data/img/map-of-europe-clipart.bmp")
     img1.blit(canvas1, width//2, height//2, tcod.BKGND_SET, 0.05, 0.05, 0)
-    img2 = tcod.image_load("data/img/ISS027-E-6501_lrg.bmp")
+    img2 = assets.manager.image("data/img/ISS027-E-6501_lrg.bmp")
     img2.blit(canvas2, width//2, height//2, tcod.BKGND_SET, 0.1, 0.1, 0)
 
     alpha1 = 1
@@ -40,7 +41,7 @@ def main():
 def init_root(w, h, title):
     font = "data/fonts/dejavu10x10_gs_tc.png"
     flags = tcod.FONT_TYPE_GREYSCALE | tcod.FONT_LAYOUT_TCOD
-    tcod.console_set_custom_font(font, flags)
+    assets.manager.font(font, flags)
     tcod.sys_set_fps(60)
     return tcod.console_init_root(w, h, title)
 
@@ -1,4 +1,5 @@
 import tcod
+import tcodplus.assets as assets
 
 
 def main():
@@ -6,7 +7,7 @@ def main():
     root = init_root(width, height, "Challenge 4: Map zoom and drag")
 
     canvas = tcod.console_new(width, height)
-    img = tcod.image_load("data/img/map-of-europe-clipart.bmp")
+    img = assets.manager.image("data/img/map-of-europe-clipart.bmp")
     img_x, img_y = width//2, height//2
     img_w, img_h = img.width, img.height
     scale = round(min(width/img_w, height/img_h), 2)
@@ -36,7 +37,7 @@ def init_root(w, h, title):
     tcod.sys_set_fps(60)
     font = "data/fonts/dejavu10x10_gs_tc.png"
     flags = tcod.FONT_TYPE_GREYSCALE | tcod.FONT_LAYOUT_TCOD
-    tcod.console_set_custom_font(font, flags)
+    assets.manager.font(font, flags)
     return tcod.console_init_root(w, h, title)
 
 
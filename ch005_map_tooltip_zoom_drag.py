@@ -5,6 +5,8 @@ import tcodplus.widgets as widgets
 import tcodplus.event as tcp_event
 import tcodplus.style as tcp_style
 import tcodplus.interfaces as interfaces
+import tcodplus.assets as assets
+from tcodplus.image import MappedImage
 
 COUNTRY_COLOR = {
     (236, 200, 77): "W. Europe",
@@ -23,7 +25,10 @@ class ImageMap(canvas.Canvas, interfaces.IMouseFocusable,
                  blend: int = tcod.BKGND_SET, **kwargs) -> None:
         super().__init__(**kwargs)
 
-        self.img = tcod.image_load(path)
+        if blend != tcod.BKGND_SET:
+            raise ValueError("ImageMap only supports tcod.BKGND_SET")
+        # mapped images are shared between the ImageMaps of the same file
+        self.img = MappedImage.open(path)
         self.scale = scale
         self._off_x = 0
         self._off_y = 0
@@ -128,7 +133,7 @@ class ImageMap(canvas.Canvas, interfaces.IMouseFocusable,
         # map blitting
         img_x = self.geometry.width // 2 + self.off_x
         img_y = self.geometry.height // 2 + self.off_y
-        self.img.blit(self.console, img_x, img_y, self.blend,
+        self.img.blit(self.console, img_x, img_y,
                       self.scale, self.scale, self.angle)
 
         self.should_update = False
@@ -137,7 +142,7 @@ class ImageMap(canvas.Canvas, interfaces.IMouseFocusable,
 def init_root(w: int, h: int, title: str) -> tcod.console.Console:
     font = "data/fonts/dejavu10x10_gs_tc.png"
     flags = tcod.FONT_TYPE_GREYSCALE | tcod.FONT_LAYOUT_TCOD
-    tcod.console_set_custom_font(font, flags)
+    assets.manager.font(font, flags)
     return tcod.console_init_root(w, h, title)
 
 
@@ -216,6 +221,8 @@ def main() -> None:
 
     # root_canvas.childs += map_canvas
     root_canvas.childs.add(europa_map, iss_img, mountain_img, tooltip)
+    # the maps are blitted independently, each on its own thread
+    root_canvas.parallel = True
 
     tcod.sys_set_fps(60)
     while not tcod.console_is_window_closed():
@@ -3,6 +3,7 @@ import tcod.event
 import tcodplus.canvas as canvas
 import tcodplus.widgets as widgets
 import tcodplus.style as tcp_style
+import tcodplus.assets as assets
 
 
 def main():
@@ -39,7 +40,7 @@ def main():
 def init_root(w, h, title):
     font = "data/fonts/dejavu10x10_gs_tc.png"
     flags = tcod.FONT_TYPE_GREYSCALE | tcod.FONT_LAYOUT_TCOD
-    tcod.console_set_custom_font(font, flags)
+    assets.manager.font(font, flags)
     return tcod.console_init_root(w, h, title)
 
 
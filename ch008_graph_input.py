@@ -1,15 +1,20 @@
 from typing import Tuple
+import asyncio
 import tcod
+import tcodplus.aio as aio
+import tcodplus.assets as assets
 import tcodplus.canvas as canvas
 import tcodplus.style as tcp_style
 import tcodplus.widgets as widgets
-from ch007_graph_viewer import GraphDisplay
+import tcodplus.graph as graph
+from tcodplus.graph import GraphDisplay
 
 
 def main() -> None:
+    graph.warmup()
     font = "data/fonts/dejavu10x10_gs_tc.png"
     flags = tcod.FONT_TYPE_GREYSCALE | tcod.FONT_LAYOUT_TCOD
-    tcod.console_set_custom_font(font, flags)
+    assets.manager.font(font, flags)
 
     r_width, r_height = tcod.sys_get_current_resolution()
     c_width, c_height = tcod.sys_get_char_size()
@@ -31,31 +36,40 @@ def main() -> None:
                     border=tcp_style.Border.DASHED,
                     origin=tcp_style.Origin.TOP_RIGHT)
 
-    gd = GraphDisplay(style=gd_style)
-    rp = RPanel(style=rp_style)
+    gd = GraphDisplay(name="graph", style=gd_style)
+    rp = RPanel(name="rpanel", style=rp_style, cache_layer=True)
+    root_canvas.childs.add(gd, rp)
+    # the graph is plotted while the panel is drawn
+    root_canvas.parallel = True
+
+    registry = root_canvas.registry
+    edit_panel = registry.get("rpanel/EDIT_panel")
+    runner = aio.AsyncRunner(
+        root_canvas, lambda event: handle_event(root_canvas, event))
 
-    def add_fun(event: tcod.event.Event) -> None:
+    async def add_fun(event: tcod.event.Event) -> None:
         if event.type == "KEYDOWN" and event.sym != tcod.event.K_RETURN:
             return
-        gd.add_fun(rp._focused_panel.edit_values)
+        # compiling the function imports sympy on a cache miss: the UI keeps
+        # running meanwhile
+        name, fun, symbol, _ = edit_panel.edit_values
+        gf = await runner.run_in_executor(graph.GraphFunction, name, fun,
+                                          symbol)
+        gd.add_graph_fun(gf)
 
-    rp._focused_panel.childs["button_addmod"].focus_dispatcher.ev_keydown += [add_fun]
-    rp._focused_panel.childs["button_addmod"].focus_dispatcher.ev_mousebuttondown += [add_fun]
-
-    root_canvas.childs.add(gd, rp)
+    button_addmod = registry.get("rpanel/EDIT_panel/button_addmod")
+    button_addmod.focus_dispatcher.ev_keydown += [add_fun]
+    button_addmod.focus_dispatcher.ev_mousebuttondown += [add_fun]
 
-    tcod.sys_set_fps(60)
-    while not tcod.console_is_window_closed():
-        root_canvas.refresh()
-        tcod.console_flush()
-        handle_events(root_canvas)
+    asyncio.run(runner.run())
 
 
-def handle_events(root_canvas: canvas.RootCanvas) -> None:
-    for event in tcod.event.get():
-        if event.type == "KEYDOWN" and event.sym == tcod.event.K_ESCAPE:
-            raise SystemExit()
-        root_canvas.handle_focus_event(event)
+def handle_event(root_canvas: canvas.RootCanvas,
+                 event: tcod.event.Event) -> None:
+    if event.type == "QUIT" or (event.type == "KEYDOWN"
+                                and event.sym == tcod.event.K_ESCAPE):
+        raise SystemExit()
+    root_canvas.handle_focus_event(event)
 
 
 class RPanel(canvas.Canvas):
@@ -67,7 +81,9 @@ class RPanel(canvas.Canvas):
                           display=tcp_style.Display.NONE)
         view_style = dict(y=4, width=1., height=1.,
                           display=tcp_style.Display.NONE)
-        e_panel = EditPanel(name="EDIT_panel", style=edit_style)
+        # the edit panel is mostly static labels around its fields
+        e_panel = EditPanel(name="EDIT_panel", style=edit_style,
+                            cache_layer=True)
         v_panel = ViewPanel(name="VIEW_panel", style=view_style)
         self.childs.add(e_panel, v_panel)
         self._focused_panel = e_panel  # TODO: make this dynamic...
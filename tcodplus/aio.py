@@ -0,0 +1,154 @@
+"""Run a RootCanvas on an asyncio event loop
+
+AsyncRunner replaces the blocking main loops:
+
+    def handle_event(event):
+        ...
+
+    aio.run(root_canvas, handle_event)
+
+Events are polled as a task of the loop, so the UI shares the loop with
+sockets, timers or subprocesses. The event handlers of CanvasDispatcher may
+be coroutine functions, run as tasks, and heavy work is offloaded to an
+executor with run_in_executor() or offload().
+"""
+from __future__ import annotations
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Hashable, \
+    List, Optional, Set
+import asyncio
+import functools
+import tcod.event
+import tcodplus.event as tcp_event
+
+if TYPE_CHECKING:
+    from tcodplus.canvas import RootCanvas
+
+
+class AsyncRunner:
+    """AsyncRunner drives a RootCanvas from an asyncio event loop.
+
+    Each frame, the pending events are dispatched to handle_event, then the
+    RootCanvas is refreshed and only flushed if something was redrawn. A
+    headless RootCanvas has no events. Frames are paced by awaiting, not by
+    tcod.sys_set_fps(), which must not be used as it blocks the loop.
+
+    While it runs, it is the async_runner of tcodplus.event: the coroutines
+    returned by event handlers run as tasks, and the exceptions they raise
+    are raised by run().
+
+    Args:
+        root: RootCanvas: the RootCanvas to run
+        handle_event: Callable[[tcod.event.Event], Any]: called with each
+            event, it may be a coroutine function. By default, the focus
+            events of the RootCanvas are handled and QUIT stops the runner.
+        fps: float: the maximum number of frames per second
+        executor: Optional[Executor]: where run_in_executor() and offload()
+            run, the default executor of the loop if None
+    """
+
+    def __init__(self, root: RootCanvas,
+                 handle_event: Optional[Callable[[tcod.event.Event],
+                                                 Any]] = None,
+                 fps: float = 60, executor: Optional[Executor] = None) -> None:
+        self.root = root
+        self.handle_event = handle_event
+        self.fps = fps
+        self.executor = executor
+        self._tasks: Set[asyncio.Task] = set()
+        self._errors: List[BaseException] = []
+        self._running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def stop(self) -> None:
+        """stop run() after the current frame"""
+        self._running = False
+
+    def spawn(self, awaitable: Awaitable[Any]) -> asyncio.Task:
+        """run awaitable as a task of the runner: its exception, if any, is
+        raised by run()"""
+        task = asyncio.ensure_future(awaitable, loop=self._loop)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._errors.append(task.exception())
+
+    async def run_in_executor(self, fun: Callable[..., Any],
+                              *args: Any, **kwargs: Any) -> Any:
+        """await fun(*args, **kwargs) run in the executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(fun, *args, **kwargs))
+
+    def offload(self, fun: Callable[..., Any], *args: Any,
+                then: Optional[Callable[[Any], Any]] = None,
+                key: Optional[Hashable] = None) -> asyncio.Task:
+        """run fun(*args) in the executor and post then(result) to the
+        mailbox of the RootCanvas, so that it is applied on the next frame,
+        coalesced with the other results posted with the same key
+
+        Returns:
+            asyncio.Task: the task waiting for the result
+        """
+        async def offloaded() -> Any:
+            result = await self.run_in_executor(fun, *args)
+            if then is not None:
+                self.root.post(functools.partial(then, result), key)
+            return result
+        return self.spawn(offloaded())
+
+    def dispatch(self, event: tcod.event.Event) -> None:
+        if self.handle_event is None:
+            if event.type == "QUIT":
+                self.stop()
+            else:
+                self.root.handle_focus_event(event)
+            return
+        result = self.handle_event(event)
+        if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+            self.spawn(result)
+
+    def frame(self) -> bool:
+        """dispatch the pending events and draw a frame
+
+        Returns:
+            bool: True if the RootCanvas was flushed
+        """
+        if not self.root.headless:
+            for event in tcod.event.get():
+                self.dispatch(event)
+        if self.root.refresh():
+            self.root.flush()
+            return True
+        return False
+
+    async def run(self) -> None:
+        """run frames until stop() is called or the window is closed"""
+        self._loop = asyncio.get_running_loop()
+        previous_runner = tcp_event.async_runner
+        tcp_event.async_runner = self.spawn
+        self._running = True
+        try:
+            while self._running and not self.root.is_closed():
+                start = self._loop.time()
+                self.frame()
+                if self._errors:
+                    raise self._errors.pop(0)
+                delay = start + 1 / self.fps - self._loop.time()
+                await asyncio.sleep(max(0., delay))
+        finally:
+            self._running = False
+            tcp_event.async_runner = previous_runner
+            for task in list(self._tasks):
+                task.cancel()
+
+
+def run(root: RootCanvas,
+        handle_event: Optional[Callable[[tcod.event.Event], Any]] = None,
+        fps: float = 60) -> None:
+    """run the RootCanvas in a new asyncio event loop, see AsyncRunner"""
+    asyncio.run(AsyncRunner(root, handle_event, fps).run())
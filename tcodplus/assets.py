@@ -0,0 +1,156 @@
+from __future__ import annotations
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import tcod
+
+
+class AssetManager:
+    """AssetManager loads the fonts and images on first use, and shares them
+
+    Images are deduplicated by path and by content: two paths to files with
+    the same content give the same tcod.image.Image. Loaded images are kept
+    in a least recently used cache, evicted once their total size exceeds
+    the memory budget. Images still referenced elsewhere stay alive, they
+    are only reloaded on the next use.
+
+    Every method can be called from any thread.
+
+    Args:
+        budget: int: the memory budget of the cached images, in bytes
+        workers: int: the number of threads used to preload the assets
+    """
+
+    def __init__(self, budget: int = 256 << 20, workers: int = 2) -> None:
+        self.budget = budget
+        self._workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.RLock()
+        self._font: Optional[Tuple[str, int]] = None
+        # realpath -> (mtime_ns, size, content digest)
+        self._digests: Dict[str, Tuple[int, int, str]] = {}
+        # content digest -> image, least recently used first
+        self._images: OrderedDict = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        self.memory = 0
+
+    def font(self, path: str, flags: int = tcod.FONT_LAYOUT_TCOD
+             | tcod.FONT_TYPE_GREYSCALE) -> None:
+        """use the font at path for the next root console
+
+        The font is only loaded if it is not already the current one.
+        """
+        key = (os.path.realpath(path), flags)
+        with self._lock:
+            if key == self._font:
+                return
+            tcod.console_set_custom_font(path, flags)
+            self._font = key
+
+    def image(self, path: str) -> tcod.image.Image:
+        """get the image at path, loading it if it is not cached
+
+        The returned image is shared: copy it before modifying it.
+        """
+        return self._request(path).result()
+
+    def preload(self, *paths: str) -> List[Future]:
+        """start loading the images at paths in background threads
+
+        Returns:
+            List[Future]: the futures of the loaded images
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self._workers, thread_name_prefix="tcodplus-assets")
+            return [self._request(path, self._executor) for path in paths]
+
+    def _request(self, path: str,
+                 executor: Optional[ThreadPoolExecutor] = None) -> Future:
+        real = os.path.realpath(path)
+        with self._lock:
+            future = self._loading.get(real)
+            if future is None:
+                future = Future()
+                self._loading[real] = future
+                owner = True
+            else:
+                owner = False
+        if owner:
+            if executor is None:
+                self._load(real, future)
+            else:
+                executor.submit(self._load, real, future)
+        return future
+
+    def _load(self, real: str, future: Future) -> None:
+        try:
+            future.set_result(self._get(real))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._loading[real]
+
+    def _get(self, real: str) -> tcod.image.Image:
+        stat = os.stat(real)
+        with self._lock:
+            mtime, size, digest = self._digests.get(real, (None, None, None))
+            if (mtime, size) != (stat.st_mtime_ns, stat.st_size):
+                digest = None
+            image = self._images.get(digest)
+            if image is not None:
+                self._images.move_to_end(digest)
+                return image
+
+        with open(real, "rb") as f:
+            digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        with self._lock:
+            self._digests[real] = (stat.st_mtime_ns, stat.st_size, digest)
+            image = self._images.get(digest)
+            if image is not None:
+                self._images.move_to_end(digest)
+                return image
+
+        image = tcod.image_load(real)
+        with self._lock:
+            if digest in self._images:
+                return self._images[digest]
+            self._images[digest] = image
+            self.memory += self._size(image)
+            self._evict(keep=digest)
+        return image
+
+    @staticmethod
+    def _size(image: tcod.image.Image) -> int:
+        return image.width * image.height * 3
+
+    def _evict(self, keep: str) -> None:
+        while self.memory > self.budget and len(self._images) > 1:
+            digest, image = next(iter(self._images.items()))
+            if digest == keep:
+                break
+            del self._images[digest]
+            self.memory -= self._size(image)
+
+    def clear(self) -> None:
+        """drop every cached image"""
+        with self._lock:
+            self._images.clear()
+            self._digests.clear()
+            self.memory = 0
+
+    def shutdown(self) -> None:
+        """wait for the preloading threads to finish and stop them"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+# the AssetManager shared by the whole application
+manager = AssetManager()
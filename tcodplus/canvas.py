@@ -1,11 +1,23 @@
 from __future__ import annotations
 from collections.abc import Mapping
-from typing import List, NamedTuple, Tuple, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, NamedTuple, Tuple, Optional, Union, \
+    Set, Iterable, Dict, Any, Callable, Hashable
+import numpy as np
 import tcod
 import tcod.event
 import tcodplus.style as tcp_style
 from tcodplus import event as tcp_event
-from tcodplus.interfaces import IDrawable, IUpdatable, IKeyboardFocusable, IMouseFocusable
+from tcodplus.registry import CanvasRegistry
+from tcodplus.consoleview import ConsoleView
+from tcodplus.scheduler import UpdateScheduler
+from tcodplus.mailbox import Mailbox
+from tcodplus.assets import AssetManager, manager as default_assets
+from tcodplus.interfaces import IDrawable, IUpdatable, IKeyboardFocusable, \
+    IMouseFocusable, IMaskFocusable, IIncrementalUpdatable
+
+if TYPE_CHECKING:
+    from tcodplus.terminal import AnsiTerminal
 
 _canvasID = 0
 
@@ -21,6 +33,41 @@ Geometry = NamedTuple('Geometry', [('abs_x', int), ('abs_y', int),
                                    ('width', int), ('height', int),
                                    ('content_width', int), ('content_height', int)])
 
+# (x0, y0, x1, y1), x1 and y1 excluded
+Rect = Tuple[int, int, int, int]
+
+
+class DisplayList(NamedTuple):
+    """The flattened tree of a Canvas, as refreshed by Canvas.refresh()
+
+    canvases: List[Canvas]: the Canvas and its offsprings, in pre-order: a
+        Canvas comes before its offsprings, and its childs are in draw order
+    childs: List[List[int]]: the indexes of the childs of each Canvas
+    ends: List[int]: the index following the last offspring of each Canvas,
+        the offsprings of canvases[i] being canvases[i+1:ends[i]]
+    updatable: List[bool]: whether each Canvas is IUpdatable
+    """
+    canvases: List[Canvas]
+    childs: List[List[int]]
+    ends: List[int]
+    updatable: List[bool]
+
+
+# Canvas with at least this many childs are culled with NumPy, which only
+# pays off for wide trees, like grids
+VECTORIZED_CULLING = 32
+
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _refresh_pool() -> ThreadPoolExecutor:
+    """the thread pool shared by the parallel Canvas, see Canvas"""
+    global _refresh_executor
+    if _refresh_executor is None:
+        _refresh_executor = ThreadPoolExecutor(
+            thread_name_prefix="tcodplus-refresh")
+    return _refresh_executor
+
 
 class CanvasChilds(dict):
     """CanvasChilds is a specialized dictionary for storing Canvas' childs
@@ -30,7 +77,9 @@ class CanvasChilds(dict):
 
     Common dictionary operations are supported.
 
-    To add childs, you should typically use the add() method.
+    To add childs, you should typically use the add() method. To add, remove or
+    replace many childs at once, use add_many(), remove_many() or replace():
+    the canvas is notified only once of the change.
 
     Args:
         canvas : the canvas in which it is used
@@ -45,47 +94,117 @@ class CanvasChilds(dict):
         if k != v.name:
             raise KeyError(f"The key must be the name of the new child. Given:"
                            f"{k}, expected: {v.name}")
-        if v.name in self:
-            raise KeyError(f"A Canvas with name {v.name} already exist."
-                           f" Canvas must have unique name")
-        super().__setitem__(k, v)
-        if v.parent != self.canvas:
-            v.parent = self.canvas
+        self.add_many([v])
 
     def __delitem__(self, k: str) -> None:
-        v = self[k]
-        super().__delitem__(k)
-        if v.parent == self.canvas:
-            v.parent = None
+        self.remove_many([k])
+
+    def _check_names(self, childs: List[Canvas]) -> None:
+        names = [c.name for c in childs]
+        if len(set(names)) != len(names):
+            raise KeyError(f"Canvas must have unique name. Given: {names}")
+        for name in self.keys() & set(names):
+            raise KeyError(f"A Canvas with name {name} already exist."
+                           f" Canvas must have unique name")
+
+    def _detach(self, childs: List[Canvas]) -> None:
+        """remove childs from their current parent, notifying each old parent
+        once"""
+        old_parents = {}
+        for c in childs:
+            p = c.parent
+            if p is not None and p is not self.canvas:
+                old_parents.setdefault(id(p), (p, []))[1].append(c)
+        for p, removed in old_parents.values():
+            for c in removed:
+                dict.__delitem__(p.childs, c.name)
+                c._parent = None
+            p._childs_changed([], removed)
+
+    def add_many(self, childs: Iterable[Canvas]) -> None:
+        """add many childs at once
+
+        Names are validated before anything is added, so a failure leaves the
+        CanvasChilds untouched.
+        """
+        childs = list(childs)
+        if not childs:
+            return
+        self._check_names(childs)
+        self._detach(childs)
+        for c in childs:
+            super().__setitem__(c.name, c)
+            c._parent = self.canvas
+        self.canvas._childs_changed(childs, [])
+
+    def remove_many(self, keys: Iterable[Union[str, Canvas]]) -> List[Canvas]:
+        """remove many childs at once, given by name or by Canvas
+
+        Returns:
+            List[Canvas]: the removed childs
+        """
+        keys = [k.name if isinstance(k, Canvas) else k for k in keys]
+        for k in keys:
+            if k not in self:
+                raise KeyError(k)
+        removed = [super(CanvasChilds, self).pop(k) for k in keys]
+        for c in removed:
+            if c.parent is self.canvas:
+                c._parent = None
+        if removed:
+            self.canvas._childs_changed([], removed)
+        return removed
+
+    def replace(self, childs: Iterable[Canvas]) -> None:
+        """replace all the childs by childs, keeping their order"""
+        childs = list(childs)
+        names = [c.name for c in childs]
+        if len(set(names)) != len(names):
+            raise KeyError(f"Canvas must have unique name. Given: {names}")
+        kept = {id(c) for c in childs}
+        removed = [c for c in self.values() if id(c) not in kept]
+        added = [c for c in childs if self.get(c.name) is not c]
+
+        self._detach(added)
+        super().clear()
+        for c in removed:
+            if c.parent is self.canvas:
+                c._parent = None
+        for c in childs:
+            super().__setitem__(c.name, c)
+            c._parent = self.canvas
+        if added or removed:
+            self.canvas._childs_changed(added, removed)
 
     def update(self, other=None, **kwargs) -> None:
+        items = []
         if other is not None:
-            for k, v in other.items() if isinstance(other, Mapping) else other:
-                self[k] = v
-        for k, v in kwargs.items():
-            self[k] = v
+            items += other.items() if isinstance(other, Mapping) else other
+        items += kwargs.items()
+        for k, v in items:
+            if k != v.name:
+                raise KeyError(f"The key must be the name of the new child."
+                               f" Given: {k}, expected: {v.name}")
+        self.add_many(v for _, v in items)
 
     def copy(self) -> CanvasChilds:
         return type(self)(self.canvas, self)
 
     def clear(self) -> None:
-        while len(self) > 0:
-            k, v = self.popitem()
-            v.parent = None
+        self.remove_many(list(self))
 
     def add(self, *childs: Canvas) -> None:
-        for c in childs:
-            self[c.name] = c
+        self.add_many(childs)
 
     def pop(self, key: str) -> Canvas:
-        v = super().pop(key)
-        v.parent = None
-        return v
+        return self.remove_many([key])[0]
 
-    def popitem(self) -> Canvas:
-        kv = super().popitem()
-        kv[1].parent = None
-        return kv
+    def popitem(self) -> Tuple[str, Canvas]:
+        k, v = super().popitem()
+        if v.parent is self.canvas:
+            v._parent = None
+        self.canvas._childs_changed([], [v])
+        return k, v
 
 
 class Canvas(IDrawable):
@@ -112,14 +231,34 @@ class Canvas(IDrawable):
         console: tcod.Console: the internal Console of the Canvas where
             everything is drawn.
         style: style.Style: the style for the Canvas.
+        cache_layer: bool: if True, the Canvas keeps a copy of its console as
+            drawn by base_drawing() (and update()), under its childs. When
+            only some childs change, their area is restored from this copy
+            and only the childs intersecting it are drawn again, instead of
+            redrawing the whole Canvas. Useful for mostly static panels
+            around a few busy widgets.
+        view_mode: bool: if True, and while the Canvas is an opaque,
+            borderless leaf fully inside its parent, its console is a
+            ConsoleView of the parent console: it draws directly in its
+            parent, without a console of its own nor any blit. Its content
+            is then redrawn each time the parent is, so it suits cheap to
+            draw widgets, like the cells of a grid.
+        parallel: bool: if True, the subtrees of the childs of the Canvas are
+            updated concurrently on a shared thread pool, then drawn on the
+            Canvas in order on the calling thread. Their update() must only
+            draw to their own console, which is the case of the widgets
+            drawing with NumPy or tcod, both releasing the GIL.
     """
 
     def __init__(self, name: str = "", parent: Canvas = None,
-                 style: Union[dict, tcp_style.Style] = dict()) -> None:
+                 style: Union[dict, tcp_style.Style] = dict(),
+                 cache_layer: bool = False, view_mode: bool = False,
+                 parallel: bool = False) -> None:
         self.name = name or _genCanvasID()
         self._geom: Geometry = Geometry(0, 0, 0, 0, 0, 0, 0, 0)
 
         self._parent = None
+        self._structure_changed = False
         self.childs: CanvasChilds[str, Canvas] = CanvasChilds(self)
         self._focused_childs = tcp_event.MouseFocus({}, {}, {})
 
@@ -128,6 +267,22 @@ class Canvas(IDrawable):
         self.console = self.init_console()
 
         self._force_redraw = False
+        self._content_version = 0
+
+        self.cache_layer = cache_layer
+        self.view_mode = view_mode
+        self.parallel = parallel
+        # spreads the updates of the IIncrementalUpdatable offsprings over
+        # frames when refresh() is called on this Canvas, see refresh()
+        self.scheduler: Optional[UpdateScheduler] = None
+        # set by the parent when the Canvas geometry or style changed
+        self._base_dirty = False
+        self._layer: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._layer_rects: Dict[str, Rect] = {}
+        self._display_list: Optional[DisplayList] = None
+        # what the geometry was last computed from, see refresh()
+        self._geometry_style: Optional[tcp_style.Style] = None
+        self._geometry_key: Optional[tuple] = None
 
     @property
     def force_redraw(self) -> bool:
@@ -160,15 +315,53 @@ class Canvas(IDrawable):
 
     @parent.setter
     def parent(self, value) -> None:
-        # !!! Order is important, don't touch !!!
-        old_parent = self._parent
-        self._parent = value
+        if value is self._parent:
+            return
+        if value is None:
+            self._parent.childs.remove_many([self.name])
+        else:
+            value.childs.add_many([self])
 
-        if value != old_parent:
-            if old_parent is not None and self.name in old_parent.childs:
-                del old_parent.childs[self.name]
-            if value is not None and self.name not in value.childs:
-                value.childs[self.name] = self
+    @property
+    def root(self) -> Canvas:
+        """The top-most ancestor of the Canvas, the Canvas itself if it has no
+        parent"""
+        canvas = self
+        while canvas.parent is not None:
+            canvas = canvas.parent
+        return canvas
+
+    def _childs_changed(self, added: List[Canvas],
+                        removed: List[Canvas]) -> None:
+        """Called by CanvasChilds, once per operation, when childs are added
+        or removed.
+
+        The Canvas is redrawn on the next refresh and the focus of the removed
+        childs is dropped.
+        """
+        self._structure_changed = True
+        if removed:
+            names = {c.name for c in removed}
+            self._focused_childs = tcp_event.MouseFocus(
+                *[{k: v for k, v in d.items() if k not in names}
+                  for d in self._focused_childs])
+        # the display lists of the Canvas and its ancestors are outdated
+        root = self
+        root._display_list = None
+        while root.parent is not None:
+            root = root.parent
+            root._display_list = None
+        root._structure_invalidated(self, added, removed)
+
+    def _structure_invalidated(self, canvas: Canvas, added: List[Canvas],
+                               removed: List[Canvas]) -> None:
+        """Called on the root of the tree when the childs of one of its
+        offsprings, canvas, changed.
+
+        This method should be overrode to invalidate any cache built on the
+        tree structure.
+        """
+        pass
 
     @property
     def focused_childs(self) -> tcp_event.MouseFocus:
@@ -201,8 +394,14 @@ class Canvas(IDrawable):
         style = self.styles()
         self.console.clear(bg=style.bg_color, fg=style.fg_color)
 
-    def draw(self) -> None:
-        """draw the Canvas to the parent Canvas"""
+    def draw(self, clip: Optional[Rect] = None) -> None:
+        """draw the Canvas to the parent Canvas
+
+        Args:
+            clip: Optional[Rect]: if set, only the part of the Canvas inside
+                this (x0, y0, x1, y1) rectangle of the parent content area is
+                drawn
+        """
 
         style = self.styles()
 
@@ -215,10 +414,18 @@ class Canvas(IDrawable):
             con = self.console
 
         x, y, width, height = self.geometry[2:6]
+        src_x = src_y = 0
+        if clip is not None:
+            x0, y0 = max(x, clip[0]), max(y, clip[1])
+            x1, y1 = min(x + width, clip[2]), min(y + height, clip[3])
+            if x0 >= x1 or y0 >= y1:
+                return
+            src_x, src_y = x0 - x, y0 - y
+            x, y, width, height = x0, y0, x1 - x0, y1 - y0
 
         # TODO: improve tcp_style.Outbound.PARTIAL here so that it blit on both
         # sides if on the edge
-        con.blit(self.parent.console, x, y, 0, 0, width, height,
+        con.blit(self.parent.console, x, y, src_x, src_y, width, height,
                  style.fg_alpha, style.bg_alpha, style.key_color)
 
     def _update_mouse_focus(self, event: tcod.event.MouseMotion) -> None:
@@ -376,35 +583,306 @@ class Canvas(IDrawable):
 
         return False
 
+    def is_opaque(self) -> bool:
+        """Wether or not the Canvas fully hides what is under it when drawn
+
+        Returns:
+            bool : True if the Canvas is visible and drawn without any
+                transparency
+        """
+        style = self.styles()
+        return (style.visible and style.display != tcp_style.Display.NONE
+                and style.bg_alpha >= 1. and style.fg_alpha >= 1.
+                and style.key_color is None)
+
+    def culled_childs(self) -> Set[str]:
+        """get the childs that have no visible part on the Canvas
+
+        A child is culled if it lies outside of the content area of the Canvas,
+        or if it is fully covered by an opaque sibling drawn after it.
+
+        Returns:
+            Set[str] : the names of the culled childs
+        """
+        childs = list(self.childs.values())
+        if len(childs) >= VECTORIZED_CULLING:
+            return self._culled_childs_vectorized(childs)
+        width, height = self.geometry[6:8]
+        culled = set()
+        occluders: List[Tuple[int, int, int, int]] = []
+        for c in reversed(childs):
+            x, y, c_width, c_height = c.geometry[2:6]
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(width, x + c_width), min(height, y + c_height)
+            if x0 >= x1 or y0 >= y1:
+                culled.add(c.name)
+            elif any(ox0 <= x0 and oy0 <= y0 and x1 <= ox1 and y1 <= oy1
+                     for ox0, oy0, ox1, oy1 in occluders):
+                culled.add(c.name)
+            elif c.is_opaque():
+                occluders.append((x0, y0, x1, y1))
+        return culled
+
+    def _culled_childs_vectorized(self, childs: List[Canvas]) -> Set[str]:
+        """culled_childs() with NumPy, for the Canvas with many childs"""
+        width, height = self.geometry[6:8]
+        rects = np.array([c.geometry[2:6] for c in childs])
+        x0 = np.maximum(0, rects[:, 0])
+        y0 = np.maximum(0, rects[:, 1])
+        x1 = np.minimum(width, rects[:, 0] + rects[:, 2])
+        y1 = np.minimum(height, rects[:, 1] + rects[:, 3])
+        culled = (x0 >= x1) | (y0 >= y1)
+        opaque = np.flatnonzero(~culled & np.array([c.is_opaque()
+                                                    for c in childs]))
+        if opaque.size:
+            # covered[k]: an opaque child drawn after k contains it, rows are
+            # processed by blocks to bound the memory used
+            index = np.arange(len(childs))
+            for start in range(0, len(childs), 1024):
+                k = slice(start, start + 1024)
+                contains = ((x0[opaque] <= x0[k, None])
+                            & (y0[opaque] <= y0[k, None])
+                            & (x1[k, None] <= x1[opaque])
+                            & (y1[k, None] <= y1[opaque])
+                            & (opaque > index[k, None]))
+                culled[k] |= contains.any(axis=1)
+        return {childs[i].name for i in np.flatnonzero(culled)}
+
+    def display_list(self) -> DisplayList:
+        """get the DisplayList of the Canvas, built again only after childs
+        are added or removed somewhere in its tree"""
+        if self._display_list is None:
+            canvases: List[Canvas] = []
+            childs: List[List[int]] = []
+            stack: List[Tuple[Canvas, int]] = [(self, -1)]
+            while stack:
+                c, parent = stack.pop()
+                i = len(canvases)
+                canvases.append(c)
+                childs.append([])
+                if parent >= 0:
+                    childs[parent].append(i)
+                stack += [(child, i)
+                          for child in reversed(list(c.childs.values()))]
+            # a subtree ends where the subtree of the next sibling of its
+            # root, or of the closest ancestor having one, starts
+            ends = [len(canvases)] * len(canvases)
+            for i, kids in enumerate(childs):
+                for j, k in zip(kids, kids[1:] + [ends[i]]):
+                    ends[j] = k
+            self._display_list = DisplayList(
+                canvases, childs, ends,
+                [isinstance(c, IUpdatable) for c in canvases])
+        return self._display_list
+
     def refresh(self) -> bool:
         """refresh the Canvas and its childs if needed.
 
+        Childs that are culled (see culled_childs()) are neither refreshed nor
+        drawn until they become visible again.
+
+        The tree is walked linearly along its display_list(), without
+        recursion: a first pass, in pre-order, updates the geometry of the
+        childs of each visible Canvas and culls them. A second pass, in
+        reverse order, draws each Canvas once its childs are drawn. Only the
+        refresh() of the Canvas it is called on is used.
+
+        The second pass starts with the subtrees of the childs of the
+        parallel canvases (see Canvas), each one on a thread of a shared
+        pool, so that drawing a Canvas still only happens after its childs.
+
+        If the Canvas has a scheduler, the visible IIncrementalUpdatable
+        offsprings to update are run by it between both passes, within its
+        budget. Those that do not finish keep their previous content until
+        they do, on a following refresh().
+
         Returns :
             bool : True if the Canvas had to refresh itself otherwise False
         """
+        canvases, childs, ends, updatable = self.display_list()
+        n = len(canvases)
+        active = [False] * n
+        active[0] = True
+        # for each active Canvas: (base_up, up, up_childs, culled)
+        frames: List[Optional[tuple]] = [None] * n
+        scheduler = self.scheduler
+        # for each Canvas run by the scheduler: whether its update finished
+        scheduled: List[Optional[bool]] = [None] * n
+        tasks: List[int] = []
+        restart: Set[Canvas] = set()
+
+        for i in range(n):
+            if not active[i]:
+                continue
+            canvas = canvases[i]
+            up = canvas._structure_changed
+            base_up = up or canvas._base_dirty
+            canvas._structure_changed = False
+            canvas._base_dirty = False
+
+            # update childs geometry, unless nothing it depends on changed
+            p_geom = canvas.geometry
+            p_border = canvas.styles().border
+            up_childs = {}
+            for j in childs[i]:
+                c = canvases[j]
+                c_style = c.styles()
+                if c_style is c._geometry_style and not c_style.is_modified \
+                        and c._geometry_key == (p_geom, p_border,
+                                                c.console.width,
+                                                c.console.height):
+                    up_geom = False
+                else:
+                    up_geom = c.update_geometry()
+                    c._geometry_style = c_style
+                    c._geometry_key = (p_geom, p_border, c.console.width,
+                                       c.console.height)
+                up_current_child = (up_geom or c.force_redraw
+                                    or c_style.is_modified)
+                c.force_redraw = False
+                c_style._is_modified = False
+                c._base_dirty = c._base_dirty or up_current_child
+                if updatable[j]:
+                    c.should_update = c.should_update or up_current_child
+                up_childs[c.name] = (up_geom, up_current_child)
+
+            culled = canvas.culled_childs() if childs[i] else set()
+            for j in childs[i]:
+                active[j] = canvases[j].name not in culled
+            frames[i] = (base_up, up, up_childs, culled)
+
+            if scheduler is not None and i > 0 \
+                    and isinstance(canvas, IIncrementalUpdatable) \
+                    and not canvas.cache_layer and not canvas._view_eligible():
+                scheduled[i] = False
+                if canvas.should_update or base_up \
+                        or scheduler.pending(canvas):
+                    tasks.append(i)
+                    if base_up:
+                        restart.add(canvas)
+
+        if tasks:
+            task_canvases = [canvases[i] for i in tasks]
+            finished = scheduler.run(task_canvases, restart,
+                                     self._focused_updates(task_canvases))
+            finished_ids = {id(c) for c in finished}
+            for i in tasks:
+                scheduled[i] = id(canvases[i]) in finished_ids
+
+        ups = [False] * n
+        done = [False] * n
+        # the subtrees of the childs of the top-most parallel Canvas are
+        # refreshed first, concurrently, then the rest on this thread
+        jobs = []
+        i = 0
+        while i < n:
+            if active[i] and canvases[i].parallel:
+                jobs += [(j, ends[j]) for j in childs[i]
+                         if active[j] and not canvases[j]._view_active()]
+                i = ends[i]
+            else:
+                i += 1
+        if len(jobs) > 1:
+            futures = [_refresh_pool().submit(self._compose_range, lo, hi,
+                                              frames, scheduled, active, ups,
+                                              done)
+                       for lo, hi in jobs]
+            for future in futures:
+                future.result()
+        self._compose_range(0, n, frames, scheduled, active, ups, done)
+        return ups[0]
+
+    def _focused_updates(self, canvases: List[Canvas]) -> List[Canvas]:
+        """get which of the canvases to update the scheduler runs first"""
+        return [c for c in canvases
+                if isinstance(c, IKeyboardFocusable) and c.kbdfocus]
+
+    def _compose_range(self, lo: int, hi: int, frames: List[Optional[tuple]],
+                       scheduled: List[Optional[bool]], active: List[bool],
+                       ups: List[bool], done: List[bool]) -> None:
+        """second pass of refresh(): draw the canvases of the display list
+        from hi-1 down to lo, skipping the inactive and done ones
 
-        up = False
-
-        # refresh childs
-        for c in self.childs.values():
+        Args:
+            frames: List[Optional[tuple]]: the state of each active Canvas
+                computed by the first pass
+            scheduled: List[Optional[bool]]: for each Canvas updated by the
+                scheduler, whether its update finished, None for the others
+            active: List[bool]: whether each Canvas is refreshed
+            ups: List[bool]: set to whether each Canvas was redrawn
+            done: List[bool]: whether each Canvas was already drawn, set
+                for the drawn canvases
+        """
+        canvases, childs, _, updatable = self._display_list
+        for i in range(hi-1, lo-1, -1):
+            if not active[i] or done[i]:
+                continue
+            done[i] = True
+            canvas = canvases[i]
+            base_up, up, up_childs, culled = frames[i]
+            if canvas._view_eligible():
+                # drawn by its parent, either with the others childs or in
+                # place, so that it is not drawn twice
+                ups[i] = base_up or up \
+                    or (updatable[i] and canvas.should_update)
+                if ups[i]:
+                    canvas._content_version += 1
+                continue
 
-            c_style = c.styles()
-            up_geom = c.update_geometry()
-            up_redraw = c.force_redraw
-            up_style = c_style.is_modified
-            up_current_child = any([up_geom, up_redraw, up_style])
-            c.force_redraw = False
-            c_style._is_modified = False
-            if isinstance(c, IUpdatable):
-                c.should_update = c.should_update or up_current_child
+            changed = set()
+            views = []
+            for k, j in enumerate(childs[i]):
+                c = canvases[j]
+                up_geom, up_current_child = up_childs[c.name]
+                if c.name in culled:
+                    # a culled child might still have been visible before
+                    # moving
+                    if up_geom:
+                        changed.add(c.name)
+                elif up_current_child:
+                    changed.add(c.name)
+                elif ups[j]:
+                    # a view is drawn in place, unless a sibling covers it
+                    if c._view_active() and not any(
+                            c._overlaps(canvases[s])
+                            for s in childs[i][k+1:]
+                            if canvases[s].name not in culled):
+                        views.append(c)
+                    else:
+                        changed.add(c.name)
+
+            if canvas.cache_layer:
+                up = canvas._refresh_layer(base_up, changed, culled)
+            elif scheduled[i] is not None:
+                up = canvas._compose_scheduled(
+                    scheduled[i], base_up or up or bool(changed), culled)
+            else:
+                up = canvas._compose(base_up or up or bool(changed), culled,
+                                     updatable[i])
+            if not up and views:
+                for c in views:
+                    c._render_view()
+                up = True
+            if up:
+                canvas._content_version += 1
+            ups[i] = up
+
+    def _compose(self, up: bool, culled: Set[str], updatable: bool) -> bool:
+        """redraw the Canvas and draw its childs on it if needed
 
-            up = any([c.refresh(), up, up_current_child])
+        Args:
+            up: bool: True if the Canvas or one of its childs changed
+            culled: Set[str]: the names of the culled childs
+            updatable: bool: whether the Canvas is IUpdatable
 
+        Returns:
+            bool: True if the Canvas was redrawn
+        """
         if up:
             self.base_drawing()
 
         # update self if necessary
-        if isinstance(self, IUpdatable) and (self.should_update or up):
+        if updatable and (self.should_update or up):
             if not up:
                 self.base_drawing()
             self.update()
@@ -412,12 +890,151 @@ class Canvas(IDrawable):
 
         # draw childs if necessary
         if up:
+            self._draw_childs(culled)
+        return up
+
+    def _compose_scheduled(self, finished: bool, up: bool,
+                           culled: Set[str]) -> bool:
+        """_compose() of an IIncrementalUpdatable Canvas updated by the
+        scheduler: its update drew it if it finished, else it keeps its
+        previous content
+
+        Args:
+            finished: bool: True if its update finished
+            up: bool: True if the Canvas or one of its childs changed
+            culled: Set[str]: the names of the culled childs
+
+        Returns:
+            bool: True if the Canvas was redrawn
+        """
+        up = up or finished
+        if up:
+            self._draw_childs(culled)
+        return up
+
+    def _draw_childs(self, culled: Set[str]) -> None:
+        """draw the visible childs not drawn in place on the Canvas"""
+        for c in self.childs.values():
+            c_style = c.styles()
+            if c_style.visible and c_style.display != tcp_style.Display.NONE \
+                    and c.name not in culled and not c._render_view():
+                c.draw()
+
+    def _view_eligible(self) -> bool:
+        """whether the Canvas can currently be drawn as a view, see
+        view_mode"""
+        if not self.view_mode or self.childs or self.parent is None \
+                or self.parent.cache_layer or not self.is_opaque():
+            return False
+        if self.styles().border != tcp_style.Border.NONE:
+            return False
+        x, y, width, height = self.geometry[2:6]
+        p_width, p_height = self.parent.geometry[6:8]
+        return (0 <= x and 0 <= y and x + width <= p_width
+                and y + height <= p_height and width > 0 and height > 0)
+
+    def _view_active(self) -> bool:
+        """whether the console of the Canvas is a view of the current
+        console of its parent, at its current place"""
+        console = self.console
+        return (isinstance(console, ConsoleView)
+                and console.parent is self.parent.console
+                and console.rect == tuple(self.geometry[2:6])
+                and self._view_eligible())
+
+    def _overlaps(self, other: Canvas) -> bool:
+        style = other.styles()
+        if not style.visible or style.display == tcp_style.Display.NONE:
+            return False
+        x, y, width, height = self.geometry[2:6]
+        o_x, o_y, o_width, o_height = other.geometry[2:6]
+        return (x < o_x + o_width and o_x < x + width
+                and y < o_y + o_height and o_y < y + height)
+
+    def _render_view(self) -> bool:
+        """draw the Canvas in place in its parent console if it is eligible
+        to the view mode, else make sure it has a console of its own
+
+        Returns:
+            bool: True if the Canvas was drawn in place
+        """
+        if not self._view_eligible():
+            if isinstance(self.console, ConsoleView):
+                self.console = self.init_console()
+                self.base_drawing()
+                if isinstance(self, IUpdatable):
+                    self.update()
+            return False
+        if not self._view_active():
+            self.console = ConsoleView(self.parent.console,
+                                       *self.geometry[2:6])
+        self.base_drawing()
+        if isinstance(self, IUpdatable):
+            self.update()
+        return True
+
+    def _refresh_layer(self, base_up: bool, changed: Set[str],
+                       culled: Set[str]) -> bool:
+        """redraw the Canvas in cache_layer mode, see Canvas
+
+        Args:
+            base_up: bool: True if the Canvas itself must be redrawn
+            changed: Set[str]: the names of the childs that changed
+            culled: Set[str]: the names of the culled childs
+
+        Returns:
+            bool: True if anything was drawn
+        """
+        width, height = self.geometry[6:8]
+        rects: Dict[str, Rect] = {}
+        for c in self.childs.values():
+            c_style = c.styles()
+            if not c_style.visible or c_style.display == tcp_style.Display.NONE \
+                    or c.name in culled:
+                continue
+            x, y, c_width, c_height = c.geometry[2:6]
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(width, x + c_width), min(height, y + c_height)
+            if x0 < x1 and y0 < y1:
+                rects[c.name] = (x0, y0, x1, y1)
+
+        is_updatable = isinstance(self, IUpdatable)
+        if base_up or self._layer is None \
+                or self._layer[0].shape != self.console.ch.shape \
+                or (is_updatable and self.should_update):
+            self.base_drawing()
+            if is_updatable:
+                self.update()
+            self._layer = (self.console.ch.copy(), self.console.fg.copy(),
+                           self.console.bg.copy())
             for c in self.childs.values():
-                c_style = c.styles()
-                if c_style.visible and c_style.display != tcp_style.Display.NONE:
+                if c.name in rects:
                     c.draw()
+            self._layer_rects = rects
+            return True
 
-        return up
+        # the area of a changed child is both where it was and where it is
+        old_rects = self._layer_rects
+        moved = {name for name in rects.keys() | old_rects.keys()
+                 if rects.get(name) != old_rects.get(name)}
+        dirty = []
+        for name in changed | moved:
+            both = [r for r in (old_rects.get(name), rects.get(name)) if r]
+            if both:
+                dirty.append((min(r[0] for r in both), min(r[1] for r in both),
+                              max(r[2] for r in both), max(r[3] for r in both)))
+        self._layer_rects = rects
+
+        for x0, y0, x1, y1 in dirty:
+            for layer, array in zip(self._layer, (self.console.ch,
+                                                  self.console.fg,
+                                                  self.console.bg)):
+                array[y0:y1, x0:x1] = layer[y0:y1, x0:x1]
+            for c in self.childs.values():
+                r = rects.get(c.name)
+                if r and r[0] < x1 and x0 < r[2] and r[1] < y1 and y0 < r[3]:
+                    c.draw((x0, y0, x1, y1))
+        return bool(dirty)
 
     def __repr__(self) -> str:
         return f"{type(self).__name__} with name '{self.name}' at {hex(id(self))}"
@@ -432,7 +1049,21 @@ class Canvas(IDrawable):
 class RootCanvas(Canvas):
     """The RootCanvas. A Canvas to rule them all.
 
-    The Console of the RootCanvas is the root Console of tcod.
+    The Console of the RootCanvas is the root Console of tcod. A headless
+    RootCanvas opens no window and draws to an offscreen Console instead,
+    which flush() writes to its terminal, if any.
+
+    Its offsprings can be looked up by name, path or type through its
+    registry, see registry.CanvasRegistry.
+
+    Its scheduler spreads the updates of its IIncrementalUpdatable offsprings
+    over frames, see scheduler.UpdateScheduler: set scheduler.budget to trade
+    their latency for the one of the input, or scheduler to None to update
+    them at once.
+
+    Other threads must not change the tree directly, but post() their
+    changes to its mailbox, which are applied at the start of refresh(), see
+    mailbox.Mailbox.
 
     Args :
         width : int : the width of the Canvas, in tile
@@ -440,6 +1071,11 @@ class RootCanvas(Canvas):
         title : str : the title of the Window
         font : str : the font to use
         flags : int : tcod specific flags for the font
+        assets : AssetManager : the assets of the application, the shared
+            assets.manager by default
+        headless : bool : if True, no window nor font is loaded
+        terminal : AnsiTerminal : where a headless RootCanvas is flushed,
+            see terminal.AnsiTerminal
 
     """
 
@@ -448,20 +1084,172 @@ class RootCanvas(Canvas):
                  flags: int = tcod.FONT_LAYOUT_TCOD | tcod.FONT_TYPE_GREYSCALE,
                  fullscreen: bool = False, renderer: Optional[int] = None,
                  bg_color: Tuple[int, int, int] = tcod.black,
-                 fg_color: Tuple[int, int, int] = tcod.white) -> None:
+                 fg_color: Tuple[int, int, int] = tcod.white,
+                 assets: Optional[AssetManager] = None,
+                 headless: bool = False,
+                 terminal: Optional[AnsiTerminal] = None) -> None:
         style = tcp_style.Style(width=width, height=height,
                                 bg_color=bg_color, fg_color=fg_color)
         super().__init__(style=style)
         self._geom = Geometry(0, 0, 0, 0, width, height, width, height)
 
-        tcod.console_set_custom_font(font, flags)
-        self.console = tcod.console_init_root(width, height, title, fullscreen,
-                                              renderer)
+        self.assets = assets if assets is not None else default_assets
+        self.headless = headless
+        self.terminal = terminal
+        if headless:
+            self.console = tcod.console.Console(width, height)
+        else:
+            self.assets.font(font, flags)
+            self.console = tcod.console_init_root(width, height, title,
+                                                  fullscreen, renderer)
         self.console.clear(bg=bg_color, fg=fg_color)
 
         self.title = title
+        self.registry = CanvasRegistry(self)
+        self._hit_map: Optional[np.ndarray] = None
+        self._hit_canvases: List[Canvas] = []
         self.last_mouse_focused_offsprings = tcp_event.MouseFocus({}, {}, {})
         self.last_kbd_focused_offspring: Canvas = None
+        self.scheduler = UpdateScheduler()
+        self.mailbox = Mailbox()
+        # called after each refresh() with whether it redrew the RootCanvas
+        self.on_refresh: List[Callable[[RootCanvas, bool], None]] = []
+        # called with each event given to handle_focus_event()
+        self.on_event: List[Callable[[RootCanvas, tcod.event.Event],
+                                     None]] = []
+
+    def post(self, change: Callable[[], Any],
+             key: Optional[Hashable] = None) -> None:
+        """post a change to apply on the next refresh(), from any thread
+
+        Args:
+            change: Callable[[], Any]: the closure doing the change
+            key: Optional[Hashable]: if not None, a pending change posted
+                with the same key is replaced by this one
+        """
+        self.mailbox.post(change, key)
+
+    def post_value(self, target: Any, attr: str, value: Any) -> None:
+        """post setting an attribute, e.g. the value of a widget, on the next
+        refresh(), from any thread. A pending value of the same attribute of
+        target is replaced by this one.
+        """
+        self.mailbox.post_value(target, attr, value)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """wait until a change is posted, or timeout seconds
+
+        Returns:
+            bool: True if a change is pending
+        """
+        return self.mailbox.wait(timeout)
+
+    def _structure_invalidated(self, canvas: Canvas, added: List[Canvas],
+                               removed: List[Canvas]) -> None:
+        self._hit_map = None
+        for c in removed:
+            self.registry.unregister(c)
+            # drop the unfinished updates of the whole removed subtree
+            stack = [c]
+            while stack:
+                offspring = stack.pop()
+                self.scheduler.cancel(offspring)
+                stack += offspring.childs.values()
+        for c in added:
+            self.registry.register(c)
+
+        if not removed:
+            return
+        # drop the focus of offsprings no longer in the tree
+        self.last_mouse_focused_offsprings = tcp_event.MouseFocus(
+            *[{k: v for k, v in d.items() if v.root is self}
+              for d in self.last_mouse_focused_offsprings])
+        last = self.last_kbd_focused_offspring
+        if last is not None and last.root is not self:
+            self.last_kbd_focused_offspring = None
+
+    def refresh(self) -> bool:
+        self.mailbox.apply()
+        up = super().refresh()
+        if up:
+            self._hit_map = None
+        for callback in self.on_refresh:
+            callback(self, up)
+        return up
+
+    def flush(self) -> None:
+        """show the root Console: in the window, or on the terminal of a
+        headless RootCanvas"""
+        if not self.headless:
+            tcod.console_flush()
+        elif self.terminal is not None:
+            self.terminal.present(self.console)
+
+    def is_closed(self) -> bool:
+        """whether the window was closed, never for a headless RootCanvas"""
+        return not self.headless and tcod.console_is_window_closed()
+
+    def _focused_updates(self, canvases: List[Canvas]) -> List[Canvas]:
+        focused = super()._focused_updates(canvases)
+        mouse_focused = self.last_mouse_focused_offsprings.focused.values()
+        return focused + [c for c in canvases if c in mouse_focused
+                          and c not in focused]
+
+    def _build_hit_map(self) -> None:
+        """map each tile to the top-most IMouseFocusable offspring drawn on it
+        """
+        hit_map = np.full((self.geometry.height, self.geometry.width), -1,
+                          dtype=np.intc)
+        canvases = []
+        # (canvas, clip rect of its parent content area in absolute coords)
+        root_clip = (0, 0, hit_map.shape[1], hit_map.shape[0])
+        stack = [(c, root_clip) for c in reversed(list(self.childs.values()))]
+        while stack:
+            c, (cx0, cy0, cx1, cy1) = stack.pop()
+            style = c.styles()
+            if not style.visible or style.display == tcp_style.Display.NONE:
+                continue
+            abs_x, abs_y, _, _, width, height = c.geometry[:6]
+            x0, y0 = max(cx0, abs_x), max(cy0, abs_y)
+            x1, y1 = min(cx1, abs_x+width), min(cy1, abs_y+height)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            if isinstance(c, IMouseFocusable):
+                region = hit_map[y0:y1, x0:x1]
+                if isinstance(c, IMaskFocusable):
+                    mask = c.hit_mask()[y0-abs_y:y1-abs_y, x0-abs_x:x1-abs_x]
+                    region[mask] = len(canvases)
+                else:
+                    region[:] = len(canvases)
+                canvases.append(c)
+
+            # childs are drawn over their parent and their elder siblings
+            border = style.border != tcp_style.Border.NONE
+            c_x0, c_y0 = abs_x + border, abs_y + border
+            clip = (max(x0, c_x0), max(y0, c_y0),
+                    min(x1, c_x0 + c.geometry.content_width),
+                    min(y1, c_y0 + c.geometry.content_height))
+            stack += [(child, clip) for child in reversed(list(c.childs.values()))]
+        self._hit_map = hit_map
+        self._hit_canvases = canvases
+
+    def pick(self, x: int, y: int) -> Optional[Canvas]:
+        """get the top-most IMouseFocusable offspring drawn on the tile (x, y)
+
+        The tile map is rebuilt only when the tree or its content changed, so
+        picking is O(1) otherwise. IMaskFocusable offsprings are only picked
+        on the tiles of their hit_mask.
+
+        Returns:
+            Optional[Canvas]: the picked Canvas, None if there is none
+        """
+        if self._hit_map is None:
+            self._build_hit_map()
+        height, width = self._hit_map.shape
+        if not (0 <= x < width and 0 <= y < height):
+            return None
+        i = self._hit_map[y, x]
+        return self._hit_canvases[i] if i != -1 else None
 
     def update_last_mouse_focused_offsprings(self, event: tcod.event.MouseMotion) -> None:
         """update the focus of the IMouseFocusable childs and update
@@ -529,6 +1317,9 @@ class RootCanvas(Canvas):
           event: tcod.event.Event: the current event
         """
 
+        for callback in self.on_event:
+            callback(self, event)
+
         # Update keyboard and mouse focus
         if event.type == "MOUSEMOTION" and not event.state:
             self.update_last_mouse_focused_offsprings(event)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+from typing import Any, Callable, Tuple
+import numpy as np
+import tcod
+
+
+class ConsoleView:
+    """ConsoleView is a rectangle of a Console, used as a Console
+
+    ch, fg and bg are NumPy views of the parent Console arrays, so drawing to
+    the ConsoleView draws directly to its parent. clear() works on the views;
+    any other Console method goes through a temporary Console, copied back
+    afterwards.
+
+    Args:
+        parent: tcod.console.Console: the viewed Console
+        x: int: the x of the rectangle in parent
+        y: int: the y of the rectangle in parent
+        width: int: the width of the rectangle, it must fit in parent
+        height: int: the height of the rectangle, it must fit in parent
+    """
+
+    def __init__(self, parent: tcod.console.Console, x: int, y: int,
+                 width: int, height: int) -> None:
+        self.parent = parent
+        self.rect = (x, y, width, height)
+        self.ch = parent.ch[y:y+height, x:x+width]
+        self.fg = parent.fg[y:y+height, x:x+width]
+        self.bg = parent.bg[y:y+height, x:x+width]
+
+    @property
+    def width(self) -> int:
+        return self.rect[2]
+
+    @property
+    def height(self) -> int:
+        return self.rect[3]
+
+    def clear(self, ch: int = 0x20,
+              fg: Tuple[int, int, int] = (255, 255, 255),
+              bg: Tuple[int, int, int] = (0, 0, 0)) -> None:
+        self.ch[...] = ch
+        self.fg[...] = fg
+        self.bg[...] = bg
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(tcod.console.Console, name)
+        if not callable(method):
+            raise AttributeError(name)
+
+        def through_console(*args: Any, **kwargs: Any) -> Any:
+            console = tcod.console.Console(self.width, self.height)
+            arrays = ((console.ch, self.ch), (console.fg, self.fg),
+                      (console.bg, self.bg))
+            for dest, src in arrays:
+                dest[...] = src
+            result = getattr(console, name)(*args, **kwargs)
+            for src, dest in arrays:
+                np.copyto(dest, src)
+            return result
+        return through_console
@@ -0,0 +1,202 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple, Union, List, Any
+import numpy as np
+import tcod
+
+Char = Union[str, int, None]
+OptionalColor = Optional[Tuple[int, int, int]]
+Points = Sequence[Tuple[int, int]]
+
+
+def _freeze(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+@lru_cache(maxsize=256)
+def circle_mask(r: int, fill: bool = False) -> np.ndarray:
+    """get the mask of a circle of radius r, centered in a (2r+1)x(2r+1) array
+
+    Masks are cached and read-only.
+    """
+    dist = np.add.outer(np.arange(-r, r+1)**2, np.arange(-r, r+1)**2)
+    if fill:
+        return _freeze(dist < r**2)
+    return _freeze(((r-1)**2 - 1 < dist) & (dist < r**2))
+
+
+@lru_cache(maxsize=256)
+def ellipse_mask(rx: int, ry: int, fill: bool = False) -> np.ndarray:
+    """get the mask of an ellipse of radii (rx, ry), centered in a
+    (2ry+1)x(2rx+1) array
+
+    Masks are cached and read-only.
+    """
+    dx = np.arange(-rx, rx+1) / (rx + .5)
+    dy = np.arange(-ry, ry+1) / (ry + .5)
+    inside = np.add.outer(dy**2, dx**2) <= 1.
+    if fill:
+        return _freeze(inside)
+    # the outline is made of the inner cells with an outer 4-neighbour
+    padded = np.pad(inside, 1)
+    inner = padded[:-2, 1:-1] & padded[2:, 1:-1] \
+        & padded[1:-1, :-2] & padded[1:-1, 2:]
+    return _freeze(inside & ~inner)
+
+
+def paint(console: tcod.console.Console, mask: np.ndarray, x: int, y: int,
+          ch: Char = None, fg: OptionalColor = None,
+          bg: OptionalColor = None) -> None:
+    """paint the cells of console where mask is True, the top-left corner of
+    mask being at (x, y)
+
+    The mask is clipped to the console. A None ch, fg or bg is left untouched.
+    """
+    height, width = mask.shape
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(console.width, x+width), min(console.height, y+height)
+    if x0 >= x1 or y0 >= y1:
+        return
+    mask = mask[y0-y:y1-y, x0-x:x1-x]
+    for array, value in _layers(console, ch, fg, bg):
+        array[y0:y1, x0:x1][mask] = value
+
+
+def _layers(console: tcod.console.Console, ch: Char, fg: OptionalColor,
+            bg: OptionalColor) -> List[Tuple[np.ndarray, Any]]:
+    """get the (array, value) pairs to paint, skipping the None values"""
+    layers = []
+    if ch is not None:
+        layers.append((console.ch, ord(ch) if isinstance(ch, str) else ch))
+    if fg is not None:
+        layers.append((console.fg, fg))
+    if bg is not None:
+        layers.append((console.bg, bg))
+    return layers
+
+
+def paint_points(console: tcod.console.Console, xs: np.ndarray,
+                 ys: np.ndarray, ch: Char = None, fg: OptionalColor = None,
+                 bg: OptionalColor = None) -> None:
+    """paint the cells (xs[i], ys[i]) of console, ignoring those outside"""
+    inside = (0 <= xs) & (xs < console.width) \
+        & (0 <= ys) & (ys < console.height)
+    xs, ys = xs[inside], ys[inside]
+    for array, value in _layers(console, ch, fg, bg):
+        array[ys, xs] = value
+
+
+def circle(console: tcod.console.Console, x: int, y: int, r: int,
+           ch: Char = None, fg: OptionalColor = None, bg: OptionalColor = None,
+           fill: bool = False) -> None:
+    """draw a circle of radius r centered on (x, y)"""
+    paint(console, circle_mask(r, fill), x-r, y-r, ch, fg, bg)
+
+
+def ellipse(console: tcod.console.Console, x: int, y: int, rx: int, ry: int,
+            ch: Char = None, fg: OptionalColor = None,
+            bg: OptionalColor = None, fill: bool = False) -> None:
+    """draw an ellipse of radii (rx, ry) centered on (x, y)"""
+    paint(console, ellipse_mask(rx, ry, fill), x-rx, y-ry, ch, fg, bg)
+
+
+def line_points(x0: int, y0: int, x1: int,
+                y1: int) -> Tuple[np.ndarray, np.ndarray]:
+    """get the cells of the Bresenham line from (x0, y0) to (x1, y1)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the x and y coordinates of the cells
+    """
+    dx, dy = x1 - x0, y1 - y0
+    n = max(abs(dx), abs(dy))
+    t = np.arange(n+1)
+    if n == 0:
+        return np.array([x0]), np.array([y0])
+    # minor = round(t * |d_minor| / |d_major|), with integer arithmetic
+    minor = (2*t*min(abs(dx), abs(dy)) + n) // (2*n)
+    if abs(dx) >= abs(dy):
+        return x0 + np.sign(dx)*t, y0 + np.sign(dy)*minor
+    return x0 + np.sign(dx)*minor, y0 + np.sign(dy)*t
+
+
+def line(console: tcod.console.Console, x0: int, y0: int, x1: int, y1: int,
+         ch: Char = None, fg: OptionalColor = None,
+         bg: OptionalColor = None) -> None:
+    """draw a line from (x0, y0) to (x1, y1)"""
+    paint_points(console, *line_points(x0, y0, x1, y1), ch, fg, bg)
+
+
+def polyline(console: tcod.console.Console, points: Points,
+             ch: Char = None, fg: OptionalColor = None,
+             bg: OptionalColor = None, closed: bool = False) -> None:
+    """draw the lines joining the consecutive points"""
+    points = list(points)
+    if closed and points:
+        points.append(points[0])
+    if len(points) == 1:
+        points = points*2
+    segments = [line_points(*p0, *p1) for p0, p1 in zip(points, points[1:])]
+    if segments:
+        xs = np.concatenate([s[0] for s in segments])
+        ys = np.concatenate([s[1] for s in segments])
+        paint_points(console, xs, ys, ch, fg, bg)
+
+
+def polygon_mask(points: Points) -> Tuple[np.ndarray, int, int]:
+    """get the mask of the cells whose center is inside the polygon, with the
+    even-odd rule
+
+    Returns:
+        Tuple[np.ndarray, int, int]: the mask and the (x, y) position of its
+            top-left corner
+    """
+    pts = np.asarray(points, dtype=float)
+    (x0, y0), (x1, y1) = pts.min(axis=0).astype(int), \
+        pts.max(axis=0).astype(int)
+    cx = np.arange(x0, x1+1)[None, :]
+    cy = np.arange(y0, y1+1)[:, None]
+    inside = np.zeros((y1-y0+1, x1-x0+1), dtype=bool)
+    for (ax, ay), (bx, by) in zip(pts, np.roll(pts, -1, axis=0)):
+        if ay == by:
+            continue
+        crosses = (ay > cy) != (by > cy)
+        x_cross = ax + (cy - ay) * (bx - ax) / (by - ay)
+        inside ^= crosses & (cx < x_cross)
+    return inside, x0, y0
+
+
+def polygon(console: tcod.console.Console, points: Points,
+            ch: Char = None, fg: OptionalColor = None,
+            bg: OptionalColor = None, fill: bool = False) -> None:
+    """draw the outline of the polygon, and fill it if fill is True"""
+    if fill:
+        mask, x, y = polygon_mask(points)
+        paint(console, mask, x, y, ch, fg, bg)
+    polyline(console, points, ch, fg, bg, closed=True)
+
+
+def flood_fill(console: tcod.console.Console, x: int, y: int,
+               ch: Char = None, fg: OptionalColor = None,
+               bg: OptionalColor = None) -> None:
+    """fill the area of cells 4-connected to (x, y) having the same character
+    and background color as (x, y)"""
+    if not (0 <= x < console.width and 0 <= y < console.height):
+        return
+    target = (console.ch == console.ch[y, x]) \
+        & (console.bg == console.bg[y, x]).all(axis=-1)
+    region = np.zeros_like(target)
+    region[y, x] = True
+    # grow the region one step in every direction until it stops growing
+    while True:
+        grown = region.copy()
+        grown[1:] |= region[:-1]
+        grown[:-1] |= region[1:]
+        grown[:, 1:] |= region[:, :-1]
+        grown[:, :-1] |= region[:, 1:]
+        grown &= target
+        if np.array_equal(grown, region):
+            break
+        region = grown
+    for array, value in _layers(console, ch, fg, bg):
+        array[region] = value
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import List, NamedTuple, Tuple, Dict, Callable, TYPE_CHECKING
+from typing import List, NamedTuple, Tuple, Dict, Callable, Optional, Any, \
+    Awaitable, TYPE_CHECKING
+import inspect
 import tcod.event
 
 if TYPE_CHECKING:
@@ -65,7 +67,19 @@ class KeyboardFocusAdmin:
         return -1
 
 
+# runs the awaitables returned by coroutine event handlers, set by the
+# asyncio runner of the application, see aio.AsyncRunner
+async_runner: Optional[Callable[[Awaitable[Any]], Any]] = None
+
+
 class CanvasDispatcher:
+    """CanvasDispatcher calls the handlers of each event type.
+
+    Handlers may be coroutine functions: the awaitable they return is then
+    given to async_runner, which must be set, e.g. by running the
+    application with aio.AsyncRunner.
+    """
+
     def __init__(self) -> None:
         event_funs = List[Callable[[tcod.event.Event], None]]
         self.ev_keydown: event_funs = []
@@ -84,7 +98,15 @@ class CanvasDispatcher:
         if event.type:
             event_list = getattr(self, f"ev_{event.type.lower()}")
             for ev in event_list:
-                ev(event)
+                result = ev(event)
+                if inspect.isawaitable(result):
+                    if async_runner is None:
+                        if inspect.iscoroutine(result):
+                            result.close()
+                        raise RuntimeError(
+                            f"{ev} is a coroutine handler, but no "
+                            "async_runner is set")
+                    async_runner(result)
 
     def add_events(self, event_funs: List[Callable[[tcod.event.Event], None]],
                    event_types: List[str]) -> None:
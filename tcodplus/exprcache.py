@@ -0,0 +1,104 @@
+from __future__ import annotations
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, Optional
+
+# bump when the layout of the cached entries changes
+CACHE_FORMAT = 2
+
+
+def cache_dir() -> str:
+    """the directory of the tcodplus caches: $TCODPLUS_CACHE_DIR if set,
+    else ~/.cache/tcodplus"""
+    directory = os.environ.get("TCODPLUS_CACHE_DIR")
+    if directory:
+        return directory
+    base = os.environ.get("XDG_CACHE_HOME") \
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "tcodplus")
+
+
+def _sympy_version() -> str:
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:  # python < 3.8
+        import sympy
+        return sympy.__version__
+    try:
+        return version("sympy")
+    except PackageNotFoundError:
+        return ""
+
+
+class ExprCache:
+    """ExprCache stores on disk what was compiled from expression strings
+
+    Entries are dictionaries of picklable values, keyed by the expression
+    string, the version of sympy and the cache format, so that upgrading
+    either one invalidates them. Reading an entry never imports sympy: the
+    values depending on it should be stored pickled, and unpickled by the
+    caller when needed.
+
+    The cache is best effort: unreadable entries are ignored and failing to
+    write one is silent.
+
+    Args:
+        directory: str: where the entries are stored, see cache_dir()
+        name: str: the name of the cache, entries of caches with different
+            names never collide
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 name: str = "expr") -> None:
+        self.directory = os.path.join(directory or cache_dir(), name)
+        self.name = name
+        self._version: Optional[str] = None
+
+    def key(self, expr: str) -> str:
+        if self._version is None:
+            self._version = _sympy_version()
+        data = f"{CACHE_FORMAT}\0{self._version}\0{expr}".encode()
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, expr: str) -> str:
+        return os.path.join(self.directory, f"{self.key(expr)}.pickle")
+
+    def load(self, expr: str) -> Optional[Dict[str, Any]]:
+        """get the entry of expr, None if it is not cached"""
+        try:
+            with open(self._path(expr), "rb") as f:
+                stored_expr, entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError,
+                TypeError):
+            return None
+        return entry if stored_expr == expr else None
+
+    def store(self, expr: str, entry: Dict[str, Any]) -> None:
+        """write the entry of expr, replacing the previous one atomically"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump((expr, entry), f, pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self._path(expr))
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """remove every entry"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for filename in names:
+            if filename.endswith(".pickle"):
+                try:
+                    os.unlink(os.path.join(self.directory, filename))
+                except OSError:
+                    pass
@@ -0,0 +1,876 @@
+from __future__ import annotations
+import sys
+import random
+import inspect
+import pickle
+import threading
+from functools import reduce
+from enum import IntEnum, auto
+from typing import Tuple, Union, Any, Optional, List, Dict
+import numpy as np
+import tcod
+import tcod.event
+import tcodplus.canvas as canvas
+import tcodplus.widgets as widgets
+import tcodplus.style as tcp_style
+import tcodplus.interval as interval
+from tcodplus.interfaces import IIncrementalUpdatable
+from tcodplus.exprcache import ExprCache
+
+# sympy takes most of the startup time: it is only imported by the first
+# GraphFunction, or ahead of time in a background thread by warmup()
+_sy = None
+_sy_lock = threading.Lock()
+
+
+def _sympy() -> Any:
+    global _sy
+    if _sy is None:
+        with _sy_lock:
+            if _sy is None:
+                import sympy
+                _sy = sympy
+    return _sy
+
+
+def warmup() -> threading.Thread:
+    """import sympy in a background thread, so that the first GraphFunction
+    does not have to wait for it
+
+    Returns:
+        threading.Thread: the started importing thread
+    """
+    thread = threading.Thread(target=_sympy, name="tcodplus-graph-warmup",
+                              daemon=True)
+    thread.start()
+    return thread
+
+
+# parsed and compiled expressions, so that known functions are created
+# without importing sympy
+expr_cache = ExprCache(name="graph")
+
+
+def _numpy_namespace() -> Dict[str, Any]:
+    """the globals of the numpy source of the compiled expressions"""
+    namespace = dict(vars(np))
+    namespace["reduce"] = reduce
+    return namespace
+
+
+def compile_expression(fun_expr: str) -> Dict[str, Any]:
+    """parse and compile fun_expr, or get it from expr_cache
+
+    Returns:
+        Dict[str, Any]: the entry of fun_expr:
+            "expr": bytes: the pickled sympy expression
+            "numpy": Optional[str]: the source of a numpy function
+                evaluating the expression, None if it can not be evaluated
+                without sympy
+            "interval": Optional[str]: the source of its interval
+                evaluation, see tcodplus.interval, None if it has none
+
+    Raises:
+        ValueError: if fun_expr is not a valid function of at most one symbol
+    """
+    entry = expr_cache.load(fun_expr)
+    if entry is not None:
+        return entry
+
+    sy = _sympy()
+    expr = sy.sympify(fun_expr)
+    if len(expr.free_symbols) > 1:
+        raise ValueError(f"Expression invalid : "
+                         f"there must be one symbol at most."
+                         f"Given : {expr.free_symbols}")
+    elif expr.has(sy.oo, -sy.oo, sy.zoo, sy.nan):
+        raise ValueError("Expression invalid : "
+                         "Don't try to divide by zero, you scoundrel !")
+
+    symbols = list(expr.free_symbols) or [sy.Symbol("x")]
+    numeric = sy.lambdify(symbols, expr, "numpy")
+    source = inspect.getsource(numeric)
+    # only keep sources which do not need sympy
+    try:
+        namespace = _numpy_namespace()
+        exec(source, namespace)
+        x = np.linspace(-10, 10, 7)
+        with np.errstate(all="ignore"):
+            expected = np.asarray(numeric(x))
+            got = np.asarray(namespace["_lambdifygenerated"](x))
+        if not np.allclose(got, expected, equal_nan=True):
+            source = None
+    except Exception:
+        source = None
+
+    try:
+        interval_source = interval.compile_interval(expr, symbols[0])
+    except NotImplementedError:
+        interval_source = None
+
+    entry = {"expr": pickle.dumps(expr), "numpy": source,
+             "interval": interval_source}
+    expr_cache.store(fun_expr, entry)
+    return entry
+
+
+class GraphDisplay(canvas.Canvas):
+    def __init__(self, *args, title="", **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # style declaration
+        viewer_style = tcp_style.Style(x=0, y=0, width=1., height=1.,
+                                       bg_color=self.style.bg_color,
+                                       fg_color=self.style.fg_color)
+
+        fg_coords = tcod.Color(255, 255, 255)-self.style.bg_color
+        coords_style = tcp_style.Style(bg_alpha=0., fg_color=fg_coords)
+
+        bg_help = tcod.Color(255, 255, 255)-self.style.fg_color+(128, 128, 0)
+        fg_help = tcod.Color(255, 255, 255)-self.style.bg_color
+        help_style = tcp_style.Style(x=.98, y=.02, width=3, height=3,
+                                     bg_alpha=.5, fg_alpha=.75,
+                                     bg_color=bg_help, fg_color=fg_help,
+                                     origin=tcp_style.Origin.TOP_RIGHT,
+                                     border=tcp_style.Border.SOLID)
+        info_style = tcp_style.Style(max_width=20, bg_color=bg_help,
+                                     fg_color=fg_help, visible=False,
+                                     border=tcp_style.Border.SOLID)
+        crosshair_style = tcp_style.Style(width=1, height=1, bg_alpha=.1,
+                                          fg_color=(20, 20, 20), visible=False)
+
+        # widgets creation
+        viewer = GraphViewer(name="viewer", title=title, style=viewer_style)
+        crosshair = canvas.Canvas(style=crosshair_style)
+        coords = widgets.Tooltip(delay=0, fade_duration=0, style=coords_style)
+        help_ = widgets.Button("?", style=help_style)
+        info = widgets.Tooltip(delay=0.3, fade_duration=0.3, style=info_style)
+        info.value = """
+ * Drag and drop the graph viewer with the LMB.
+
+ * Zoom with the mouse wheel.
+
+ * You can zoom the X-axis only by pressing CTRL while zooming.
+
+ * You can zoom the Y-axis only by pressing SHIFT while zooming.
+ """
+
+        self.childs.add(viewer, crosshair, coords, help_, info)
+
+        crosshair.update_geometry()
+        crosshair.base_drawing()  # should probably override instead
+        crosshair.console.ch[0, 0] = 197
+
+        def viewer_crosshair_event(event: tcod.event.MouseMotion) -> None:
+            if event.type == 'MOUSEFOCUSGAIN':
+                crosshair.style.visible = True
+                crosshair.force_redraw = True
+            elif event.type == 'MOUSEFOCUSLOST':
+                crosshair.style.visible = False
+                crosshair.force_redraw = True
+            elif event.type == 'MOUSEMOTION':
+                cx, cy = event.tile
+                rel_x = cx - viewer.geometry.abs_x
+                rel_y = cy - viewer.geometry.abs_y
+                crosshair.style.x = rel_x
+                crosshair.style.y = rel_y
+
+        def viewer_coords_event(event: tcod.event.MouseMotion) -> None:
+            if event.type in ("MOUSEMOTION", "MOUSEFOCUSGAIN"):
+                mcx, mcy = event.tile
+                vabs_x, vabs_y, _, _, _, _, vwidth, vheight = viewer.geometry
+                x = viewer.itox(mcx-vabs_x)
+                y = viewer.jtoy(mcy-vabs_y)
+                coords.value = f"({x:g}, {y:g})"
+                coords.style.x = vwidth - (len(coords.value))
+                coords.style.y = vheight-1
+            else:  # MOUSEFOCUSLOST
+                coords.value = ""
+
+        def help_info_event(event: tcod.event.MouseMotion) -> None:
+            if event.type == "MOUSEFOCUSGAIN":
+                help_.style.bg_alpha = 1.0
+                help_.style.fg_alpha = 1.0
+                info.start_timer()
+                info.style.x = help_.geometry.x-info.geometry.width
+                info.style.y = help_.geometry.y
+                info.should_update = True
+                info.style.visible = True
+            else:  # MOUSEFOCUSLOST
+                help_.style.bg_alpha = 0.5
+                help_.style.fg_alpha = 0.75
+                info.should_update = False
+                info.style.visible = False
+
+        vfoc_d = viewer.focus_dispatcher
+        vfoc_d.add_events([viewer_coords_event, viewer_crosshair_event],
+                          ["MOUSEMOTION", "MOUSEFOCUSGAIN", "MOUSEFOCUSLOST"])
+
+        hfoc_d = help_.focus_dispatcher
+        hfoc_d.add_events([help_info_event],
+                          ["MOUSEFOCUSGAIN", "MOUSEFOCUSLOST"])
+
+    def add_fun(self, values: Tuple[str, str, str, str]) -> None:
+        name, fun, symbol, color = values
+        self.add_graph_fun(GraphFunction(name, fun, symbol))
+
+    def add_graph_fun(self, gf: GraphFunction) -> None:
+        self.childs["viewer"].funs[gf.name] = gf
+        self.childs["viewer"].should_update = True
+
+
+class GraphFunction:
+    def __init__(self, name: str, fun_expr: str, symbol: str = "+",
+                 color: Tuple[int, int, int] = None, title: str = ""):
+        self.name = name
+        self.fun_expr = fun_expr
+        self._compiled = compile_expression(fun_expr)
+        self._expr = None
+        self.color = color if color is not None \
+            else tuple(random.randrange(150) for _ in range(3))
+        self.symbol = symbol
+        self.title = title
+        self._numeric = None
+        self._interval = None
+
+    @property
+    def expr(self) -> Any:
+        """the sympy expression of the function, only loaded when needed"""
+        if self._expr is None:
+            _sympy()
+            self._expr = pickle.loads(self._compiled["expr"])
+        return self._expr
+
+    def evaluate(self, x: np.ndarray) -> np.ndarray:
+        """evaluate the function for every value of x at once
+
+        Returns:
+            np.ndarray: the values of the function, nan where it is undefined
+                or not real
+        """
+        if self._numeric is None:
+            source = self._compiled["numpy"]
+            if source is not None:
+                namespace = _numpy_namespace()
+                exec(source, namespace)
+                self._numeric = namespace["_lambdifygenerated"]
+            else:
+                sy = _sympy()
+                symbols = list(self.expr.free_symbols) or [sy.Symbol("x")]
+                self._numeric = sy.lambdify(symbols, self.expr, "numpy")
+        with np.errstate(all="ignore"):
+            try:
+                y = np.asarray(self._numeric(x))
+            except (TypeError, ValueError):
+                # some functions are only lambdified to scalar math ones
+                y = np.vectorize(self._scalar, otypes=[complex])(x)
+            if np.iscomplexobj(y):
+                y = np.where(y.imag == 0, y.real, np.nan)
+            return np.broadcast_to(y, np.shape(x)).astype(float)
+
+    def _scalar(self, x: float) -> complex:
+        try:
+            return complex(self._numeric(x))
+        except (ArithmeticError, TypeError, ValueError):
+            return complex(np.nan)
+
+    def evaluate_interval(self, lo: np.ndarray,
+                          hi: np.ndarray) -> Optional[interval.Interval]:
+        """bound the function over each interval [lo[i], hi[i]] at once, see
+        tcodplus.interval
+
+        Returns:
+            Optional[interval.Interval]: the bounds of the function, None if
+                it uses functions with no interval evaluation
+        """
+        if self._interval is None:
+            source = self._compiled["interval"]
+            if source is None:
+                return None
+            namespace = {"iv": interval}
+            exec(source, namespace)
+            self._interval = namespace["_interval"]
+        shape = np.shape(lo)
+        with np.errstate(all="ignore"):
+            bounds = self._interval(interval.Interval(
+                np.asarray(lo, dtype=float), np.asarray(hi, dtype=float),
+                np.ones(shape, dtype=bool)))
+        return interval.Interval(*(np.broadcast_to(v, shape)
+                                   for v in bounds))
+
+
+def column_reduce(ufunc: np.ufunc, values: np.ndarray,
+                  bounds: np.ndarray) -> np.ndarray:
+    """reduce values[bounds[i]:bounds[i+1]] with ufunc for each i
+
+    Returns:
+        np.ndarray: the len(bounds)-1 results, nan for the empty ranges
+    """
+    result = np.full(len(bounds) - 1, np.nan)
+    filled = bounds[:-1] < bounds[1:]
+    if filled.any():
+        starts = bounds[:-1][filled]
+        lo, hi = starts[0], bounds[1:][filled][-1]
+        result[filled] = ufunc.reduceat(values[lo:hi], starts - lo)
+    return result
+
+
+class Series:
+    """Base class of the sampled series a GraphViewer can plot next to
+    GraphFunction
+
+    Args:
+        name: str: the name of the series
+        symbol: str: the symbol used to plot the series in PlotMode.CELL
+        color: Tuple[int, int, int]: the color of the series
+        follow: bool: if True, the GraphViewer camera scrolls to keep the
+            newest sample on the right edge
+    """
+
+    def __init__(self, name: str, symbol: str = "+",
+                 color: Tuple[int, int, int] = None, title: str = "",
+                 follow: bool = False) -> None:
+        self.name = name
+        self.symbol = symbol
+        self.color = color if color is not None \
+            else tuple(random.randrange(150) for _ in range(3))
+        self.title = title
+        self.follow = follow
+        # incremented each time samples change
+        self.version = 0
+
+    def last_x(self) -> Optional[float]:
+        raise NotImplementedError
+
+    def column_extrema(self, edges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """get the minimum and maximum y of the samples in each column, a
+        column being [edges[i], edges[i+1])
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: the minimums and maximums, nan for
+                the columns without samples
+        """
+        raise NotImplementedError
+
+
+class DataSeries(Series):
+    """A series of sampled (x, y) values to plot in a GraphViewer
+
+    Samples are kept in a fixed capacity ring buffer: once full, appending
+    samples drops the oldest ones. x values must be appended in increasing
+    order. append() can be called from any thread.
+
+    Args:
+        capacity: int: the maximum number of samples kept
+        see Series for the other arguments
+    """
+
+    def __init__(self, name: str, capacity: int = 1 << 20, symbol: str = "+",
+                 color: Tuple[int, int, int] = None, title: str = "",
+                 follow: bool = True) -> None:
+        super().__init__(name, symbol, color, title, follow)
+        self._x = np.empty(capacity)
+        self._y = np.empty(capacity)
+        self._start = 0
+        self._len = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def capacity(self) -> int:
+        return len(self._x)
+
+    def append(self, x: Union[float, np.ndarray],
+               y: Union[float, np.ndarray]) -> None:
+        """append one sample or a batch of samples"""
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        capacity = self.capacity
+        x, y = x[-capacity:], y[-capacity:]
+        n = len(x)
+        with self._lock:
+            end = (self._start + self._len) % capacity
+            first = min(n, capacity - end)
+            self._x[end:end+first] = x[:first]
+            self._y[end:end+first] = y[:first]
+            self._x[:n-first] = x[first:]
+            self._y[:n-first] = y[first:]
+            overflow = max(0, self._len + n - capacity)
+            self._start = (self._start + overflow) % capacity
+            self._len = min(capacity, self._len + n)
+            self.version += 1
+
+    def last_x(self) -> Optional[float]:
+        with self._lock:
+            if not self._len:
+                return None
+            return self._x[(self._start + self._len - 1) % self.capacity]
+
+    def _segments(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """the samples as at most two views in increasing x order. The lock
+        must be held while they are used."""
+        start, end = self._start, self._start + self._len
+        capacity = self.capacity
+        segments = [(self._x[start:min(end, capacity)],
+                     self._y[start:min(end, capacity)])]
+        if end > capacity:
+            segments.append((self._x[:end-capacity], self._y[:end-capacity]))
+        return segments
+
+    def column_extrema(self, edges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        y_min = np.full(len(edges) - 1, np.nan)
+        y_max = np.full(len(edges) - 1, np.nan)
+        with self._lock:
+            for xs, ys in self._segments():
+                bounds = np.searchsorted(xs, edges)
+                y_min = np.fmin(y_min, column_reduce(np.minimum, ys, bounds))
+                y_max = np.fmax(y_max, column_reduce(np.maximum, ys, bounds))
+        return y_min, y_max
+
+
+class SampledSeries(Series):
+    """A large series of regularly sampled values to plot in a GraphViewer
+
+    The minimum, maximum and sum of the samples are precomputed for buckets
+    of 2**level samples, for every level. Plotting picks the level whose
+    buckets are at most one column wide, so it only touches O(width)
+    aggregates whatever the zoom.
+
+    Args:
+        y: np.ndarray: the samples. nan samples are ignored
+        x0: float: the x of the first sample
+        dx: float: the x distance between two samples
+        see Series for the other arguments
+    """
+
+    def __init__(self, name: str, y: np.ndarray, x0: float = 0.,
+                 dx: float = 1., symbol: str = "+",
+                 color: Tuple[int, int, int] = None, title: str = "") -> None:
+        super().__init__(name, symbol, color, title, follow=False)
+        self.x0 = x0
+        self.dx = dx
+        y = np.asarray(y, dtype=float).ravel()
+        self._len = len(y)
+        finite = np.isfinite(y)
+        self.mins = [y]
+        self.maxs = [y]
+        self.sums = [np.where(finite, y, 0.)]
+        self.counts = [finite.astype(np.intp)]
+        while len(self.mins[-1]) > 1:
+            self.mins.append(self._pairs(np.fmin, self.mins[-1], np.nan))
+            self.maxs.append(self._pairs(np.fmax, self.maxs[-1], np.nan))
+            self.sums.append(self._pairs(np.add, self.sums[-1], 0.))
+            self.counts.append(self._pairs(np.add, self.counts[-1], 0))
+
+    @staticmethod
+    def _pairs(ufunc: np.ufunc, values: np.ndarray, pad: Any) -> np.ndarray:
+        if len(values) % 2:
+            values = np.append(values, pad)
+        return ufunc(values[::2], values[1::2])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def last_x(self) -> Optional[float]:
+        return self.x0 + (self._len-1) * self.dx if self._len else None
+
+    def level_bounds(self, edges: np.ndarray) -> Tuple[int, np.ndarray]:
+        """get the pyramid level to use for the columns delimited by edges,
+        and the bucket bounds of each column at this level"""
+        idx = np.clip(np.ceil((edges - self.x0) / self.dx), 0, self._len)
+        per_col = (edges[-1] - edges[0]) / self.dx / max(1, len(edges) - 1)
+        level = int(np.clip(np.floor(np.log2(max(per_col, 1.))),
+                            0, len(self.mins) - 1))
+        bounds = np.round(idx / 2**level).astype(np.intp)
+        return level, np.minimum(bounds, len(self.mins[level]))
+
+    def column_extrema(self, edges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        level, bounds = self.level_bounds(edges)
+        return (column_reduce(np.fmin, self.mins[level], bounds),
+                column_reduce(np.fmax, self.maxs[level], bounds))
+
+    def column_means(self, edges: np.ndarray) -> np.ndarray:
+        """get the mean y of the samples in each column, nan for the columns
+        without samples"""
+        level, bounds = self.level_bounds(edges)
+        sums = column_reduce(np.add, self.sums[level], bounds)
+        counts = column_reduce(np.add, self.counts[level], bounds)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+
+class PlotMode(IntEnum):
+    """How the curves are rendered by a GraphViewer
+
+    CELL plots one symbol per cell. QUADRANT splits each cell in 2x2 sub-cells
+    using the tcod sub-cell characters. BRAILLE splits each cell in 2x4 dots
+    and needs a font with the unicode braille patterns.
+    """
+    CELL = auto()
+    QUADRANT = auto()
+    BRAILLE = auto()
+
+
+def _quadrant_glyphs() -> Tuple[np.ndarray, np.ndarray]:
+    """get the characters of the 16 quadrant patterns, and wether foreground
+    and background colors must be swapped to display them.
+
+    Patterns are indexed by NW*8 + NE*4 + SW*2 + SE
+    """
+    nw, ne, sw, se = 8, 4, 2, 1
+    chars = {0: ord(" "),
+             nw: tcod.CHAR_SUBP_NW, ne: tcod.CHAR_SUBP_NE,
+             sw: tcod.CHAR_SUBP_SW, se: tcod.CHAR_SUBP_SE,
+             nw | ne: tcod.CHAR_SUBP_N, ne | se: tcod.CHAR_SUBP_E,
+             nw | se: tcod.CHAR_SUBP_DIAG}
+    glyphs = np.zeros(16, dtype=np.intc)
+    inverted = np.zeros(16, dtype=bool)
+    for pattern in range(16):
+        if pattern in chars:
+            glyphs[pattern] = chars[pattern]
+        else:
+            glyphs[pattern] = chars[15 ^ pattern]
+            inverted[pattern] = True
+    return glyphs, inverted
+
+
+# parts a discontinuous column is split in by GraphViewer.plot_mask
+SUBDIVISIONS = 16
+
+QUADRANT_WEIGHTS = np.array([[8, 4], [2, 1]])
+QUADRANT_GLYPHS, QUADRANT_INVERTED = _quadrant_glyphs()
+BRAILLE_WEIGHTS = np.array([[0x01, 0x08], [0x02, 0x10],
+                            [0x04, 0x20], [0x40, 0x80]])
+
+
+class Camera:
+    def __init__(self, x: float = 0, y: float = 0,
+                 zoom_x: float = 0, zoom_y: float = 0):
+        self.x = x
+        self.y = y
+        self.zoom_x = zoom_x
+        self.zoom_y = zoom_y
+
+
+class GraphViewer(widgets.BoxFocusable, widgets.BaseKeyboardFocusable,
+                  IIncrementalUpdatable):
+    def __init__(self, *args, title="", camera=Camera(),
+                 plot_mode=PlotMode.CELL, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.title = title
+        self.funs = {}
+        self.camera = camera
+        self.plot_mode = plot_mode
+        self._drawn_versions = {}
+        self.axis_color = (200, 60, 60)
+        self.axis_step = 15
+        self._shifts = False
+        self._ctrls = False
+
+        def ev_mousemotion(event: tcod.event.MouseMotion) -> None:
+            mcx, mcy = event.tile
+
+            # Drag
+            dcx = dcy = 0
+            if event.state & tcod.event.BUTTON_LMASK:
+                dcx, dcy = event.tile_motion
+                if dcx:
+                    self.camera.x -= dcx*2**self.camera.zoom_x
+                if dcy:
+                    self.camera.y += dcy*2**self.camera.zoom_y
+                if dcx or dcy:
+                    self.should_update = True
+
+            if event.type == 'MOUSEFOCUSGAIN':
+                tcod.mouse_show_cursor(False)
+                if not self.kbdfocus:
+                    self.kbdfocus_requested = True
+            elif event.type == 'MOUSEFOCUSLOST':
+                tcod.mouse_show_cursor(True)
+
+        def ev_mousewheel(event: tcod.event.MouseWheel) -> None:
+            mv = (-1+event.flipped*2) * event.y
+            is_zx_ok = self.camera.zoom_x < 54
+            is_zy_ok = self.camera.zoom_y < 54
+
+            if self._shifts and (is_zx_ok or mv < 0):
+                self.camera.zoom_x += mv
+            elif self._ctrls and (is_zy_ok or mv < 0):
+                self.camera.zoom_y += mv
+            else:
+                if is_zx_ok or mv < 0:
+                    self.camera.zoom_x += mv
+                if is_zy_ok or mv < 0:
+                    self.camera.zoom_y += mv
+            self.should_update = True
+
+        def ev_keydown(event: tcod.event.KeyDown) -> None:
+            if event.sym in (tcod.event.K_LSHIFT, tcod.event.K_RSHIFT):
+                self._shifts = True
+            elif event.sym in (tcod.event.K_LCTRL, tcod.event.K_RCTRL):
+                self._ctrls = True
+
+        def ev_keyup(event: tcod.event.KeyUp) -> None:
+            if event.sym in (tcod.event.K_LSHIFT, tcod.event.K_RSHIFT):
+                self._shifts = False
+            elif event.sym in (tcod.event.K_LCTRL, tcod.event.K_RCTRL):
+                self._ctrls = False
+
+        foc_d = self.focus_dispatcher
+        foc_d.add_events([ev_mousemotion],
+                         ["MOUSEMOTION", "MOUSEFOCUSLOST", "MOUSEFOCUSGAIN"])
+        foc_d.ev_mousewheel += [ev_mousewheel]
+        foc_d.ev_keydown += [ev_keydown]
+        foc_d.ev_keyup += [ev_keyup]
+
+    @property
+    def should_update(self) -> bool:
+        # DataSeries may receive samples from other threads at any time
+        return self._should_update or any(
+            fun.version != self._drawn_versions.get(name)
+            for name, fun in self.funs.items() if isinstance(fun, Series))
+
+    @should_update.setter
+    def should_update(self, value: bool) -> None:
+        self._should_update = value
+
+    def follow_series(self) -> None:
+        """move the camera so that the newest sample of the followed
+        Series is on the right edge"""
+        last_xs = [fun.last_x() for fun in self.funs.values()
+                   if isinstance(fun, Series) and fun.follow]
+        last_xs = [x for x in last_xs if x is not None]
+        if last_xs:
+            width = self.geometry.content_width
+            self.camera.x = max(last_xs) \
+                - (width - 1 - width//2) * 2**self.camera.zoom_x
+
+    def itox(self, i: int) -> float:
+        return self.camera.x + (i-self.geometry.content_width//2)*(2**self.camera.zoom_x)
+
+    def jtoy(self, j: int) -> float:
+        return self.camera.y + (self.geometry.content_height//2-j)*(2**self.camera.zoom_y)
+
+    def xtoi(self, x: float) -> int:
+        x = sorted([-sys.maxsize, x, sys.maxsize])[1]
+        return round((x - self.camera.x) / (2**self.camera.zoom_x)
+                     + self.geometry.content_width // 2)
+
+    def ytoj(self, y: float) -> int:
+        y = sorted([-sys.maxsize, y, sys.maxsize])[1]
+        return round(((y - self.camera.y) / (2**self.camera.zoom_y)
+                      - self.geometry.content_height // 2) * (-1))
+
+    def update_steps(self):
+        # requests made while the functions are plotted need another update
+        self.should_update = False
+        self._drawn_versions = {name: fun.version
+                                for name, fun in self.funs.items()
+                                if isinstance(fun, Series)}
+        self.follow_series()
+
+        # the costly part: plotting each function, which may also compile it
+        if self.plot_mode == PlotMode.BRAILLE:
+            sub_h, sub_w = BRAILLE_WEIGHTS.shape
+        elif self.plot_mode == PlotMode.QUADRANT:
+            sub_h, sub_w = QUADRANT_WEIGHTS.shape
+        else:
+            sub_h = sub_w = 1
+        plots = []
+        for fun in list(self.funs.values()):
+            plots.append((fun, self.plot_mask(fun, sub_w, sub_h)))
+            yield
+
+        itox = self.itox
+        jtoy = self.jtoy
+        xtoi = self.xtoi
+        ytoj = self.ytoj
+
+        def init_axis():
+            width, height = self.geometry[6:]
+            i_axis = sorted([0, xtoi(0), width-1])[1]
+            j_axis = sorted([0, ytoj(0), height-1])[1]
+
+            # drawing the axis line
+            self.console.ch[:, i_axis] = 179
+            self.console.ch[j_axis, :] = 196
+            self.console.fg[:, i_axis] = [50]*3
+            self.console.fg[j_axis, :] = [50]*3
+            self.console.ch[j_axis, i_axis] = 197
+            self.console.ch[j_axis, width-1] = 16
+            self.console.ch[0, i_axis] = 30
+
+            # drawing the axis step
+            step = self.axis_step
+            for i in range((width//2) % step, width, step):
+                x = itox(i)
+                x = f"{x:g}"
+                x_width = len(x)
+                i0 = i - x_width//2
+                if 0 <= i0 and i0+x_width < width:
+                    self.console.ch[j_axis, i0:i0+x_width] = [ord(c)
+                                                              for c in x]
+                    self.console.fg[j_axis, i0:i0+x_width] = self.axis_color
+
+            for j in range((height//2) % step, height, step):
+                y = jtoy(j)
+                y = f"{y:g}"
+                y_width = len(y)
+                i0 = i_axis - y_width//2
+                if i0 < 0:
+                    i0 = 0
+                elif i0+y_width >= width:
+                    i0 = width-y_width
+                self.console.ch[j, i0:i0+y_width] = [ord(c) for c in y]
+                self.console.fg[j, i0:i0+y_width] = self.axis_color
+
+        self.console.clear(fg=self.style.fg_color, bg=self.style.bg_color)
+        self.console.ch[:] = ord("#")
+        init_axis()
+
+        if self.plot_mode != PlotMode.CELL:
+            self.plot_subcells(plots)
+            return
+
+        for fun, mask in plots:
+            self.console.ch[mask] = ord(fun.symbol)
+            self.console.fg[mask] = fun.color
+
+    def subcell_rows(self, y: np.ndarray, sub_h: int) -> np.ndarray:
+        """convert y values to (fractional) sub-row indices, sub_h being the
+        number of sub-rows per cell"""
+        height = self.geometry.content_height
+        j = height//2 - (y - self.camera.y) / 2**self.camera.zoom_y
+        return (j + .5) * sub_h - .5
+
+    def subcell_xs(self, sub_w: int, edges: bool = False) -> np.ndarray:
+        """get the x value at the center of each sub-column, sub_w being the
+        number of sub-columns per cell. If edges is True, get the x values of
+        the sub-columns edges instead."""
+        width = self.geometry.content_width
+        k = np.arange(width*sub_w + 1) - .5 if edges \
+            else np.arange(width * sub_w)
+        i = (k + .5) / sub_w - .5
+        return self.camera.x + (i - width//2) * 2**self.camera.zoom_x
+
+    @staticmethod
+    def spans_mask(lo: np.ndarray, hi: np.ndarray, n_rows: int) -> np.ndarray:
+        """get the (n_rows, *lo.shape) mask of the rows between lo and hi,
+        inclusive, in each column. Columns with a nan bound are empty."""
+        rows = np.arange(n_rows).reshape((-1,) + (1,)*np.ndim(lo))
+        with np.errstate(invalid="ignore"):
+            return (rows >= np.floor(lo + .5)) & (rows <= np.floor(hi + .5))
+
+    @staticmethod
+    def curve_spans(r: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """get, for each sample column, the span of rows joining the sample
+        r[k] halfway to its valid neighbours"""
+        valid = np.isfinite(r)
+        r = np.where(valid, r, np.nan)
+        prev_mid = np.concatenate([[np.nan], (r[:-1] + r[1:]) / 2])
+        next_mid = np.concatenate([(r[:-1] + r[1:]) / 2, [np.nan]])
+        prev_mid = np.where(np.isnan(prev_mid), r, prev_mid)
+        next_mid = np.where(np.isnan(next_mid), r, next_mid)
+        lo = np.minimum(r, np.minimum(prev_mid, next_mid))
+        hi = np.maximum(r, np.maximum(prev_mid, next_mid))
+        return lo, hi
+
+    def source_spans(self, fun: Union[GraphFunction, Series], sub_w: int,
+                     sub_h: int) -> Tuple[np.ndarray, np.ndarray]:
+        """get the span of sub-rows to plot in each sub-column for fun
+
+        A Series is decimated to the minimum and maximum of the samples
+        of each sub-column, joined halfway to its neighbours.
+        """
+        n_rows = self.geometry.content_height * sub_h
+        if isinstance(fun, Series):
+            y_min, y_max = fun.column_extrema(self.subcell_xs(sub_w, True))
+            top = self.subcell_rows(y_max, sub_h)
+            bottom = self.subcell_rows(y_min, sub_h)
+            lo, hi = self.curve_spans(np.clip((top + bottom) / 2,
+                                              -1, n_rows))
+            lo = np.fmin(lo, np.clip(top, -1, n_rows))
+            hi = np.fmax(hi, np.clip(bottom, -1, n_rows))
+            return lo, hi
+
+        r = self.subcell_rows(fun.evaluate(self.subcell_xs(sub_w)), sub_h)
+        # far away samples are clipped just out of the view
+        return self.curve_spans(np.clip(r, -1, n_rows))
+
+    def interval_mask(self, y_lo: np.ndarray, y_hi: np.ndarray,
+                      cont: np.ndarray, sub_h: int) -> np.ndarray:
+        """get the mask of the sub-rows between y_lo and y_hi in each
+        sub-column, leaving empty the discontinuous ones"""
+        n_rows = self.geometry.content_height * sub_h
+        top = np.clip(self.subcell_rows(y_hi, sub_h), -1, n_rows)
+        bottom = np.clip(self.subcell_rows(y_lo, sub_h), -1, n_rows)
+        return self.spans_mask(np.where(cont, top, np.nan), bottom, n_rows)
+
+    def plot_mask(self, fun: Union[GraphFunction, Series], sub_w: int,
+                  sub_h: int) -> np.ndarray:
+        """get the (sub-rows, sub-columns) mask of the sub-cells to plot for
+        fun
+
+        A GraphFunction with an interval evaluation is bounded over each
+        whole sub-column, so nothing between two samples is missed. The
+        sub-columns where it may be discontinuous, e.g. across a pole, are
+        split in SUBDIVISIONS parts, and the parts still discontinuous are
+        left empty, so that asymptotes are not joined by vertical lines.
+        """
+        n_rows = self.geometry.content_height * sub_h
+        edges = self.subcell_xs(sub_w, edges=True)
+        bounds = fun.evaluate_interval(edges[:-1], edges[1:]) \
+            if isinstance(fun, GraphFunction) else None
+        if bounds is None:
+            return self.spans_mask(*self.source_spans(fun, sub_w, sub_h),
+                                   n_rows)
+
+        mask = self.interval_mask(*bounds, sub_h)
+        split = np.flatnonzero(~bounds.cont)
+        if split.size:
+            t = np.linspace(0., 1., SUBDIVISIONS + 1)
+            x0, x1 = edges[split, None], edges[split + 1, None]
+            sub_edges = x0 + (x1 - x0) * t
+            parts = fun.evaluate_interval(sub_edges[:, :-1], sub_edges[:, 1:])
+            mask[:, split] = self.interval_mask(*parts, sub_h).any(axis=-1)
+        return mask
+
+    def plot_subcells(self, plots: List[Tuple[Union[GraphFunction, Series],
+                                              np.ndarray]]) -> None:
+        """draw the plot_mask() of every function in sub-cells glyphs,
+        depending on plot_mode"""
+        width, height = self.geometry[6:]
+        if self.plot_mode == PlotMode.BRAILLE:
+            weights = BRAILLE_WEIGHTS
+        else:
+            weights = QUADRANT_WEIGHTS
+        sub_h, sub_w = weights.shape
+
+        bits = np.zeros((height*sub_h, width*sub_w), dtype=bool)
+        color_index = np.full((height, width), -1)
+        colors = []
+        for fun, mask in plots:
+            bits |= mask
+            touched = mask.reshape(height, sub_h, width, sub_w).any(axis=(1, 3))
+            color_index[touched] = len(colors)
+            colors.append(fun.color)
+
+        patterns = (bits.reshape(height, sub_h, width, sub_w)
+                    * weights[None, :, None, :]).sum(axis=(1, 3))
+        plotted = patterns > 0
+        if not plotted.any():
+            return
+        fg = np.array(colors, dtype=np.uint8)[color_index[plotted]]
+        if self.plot_mode == PlotMode.BRAILLE:
+            self.console.ch[plotted] = 0x2800 + patterns[plotted]
+            self.console.fg[plotted] = fg
+        else:
+            inverted = QUADRANT_INVERTED[patterns] & plotted
+            normal = plotted & ~inverted
+            self.console.ch[plotted] = QUADRANT_GLYPHS[patterns[plotted]]
+            self.console.fg[normal] = fg[normal[plotted]]
+            self.console.fg[inverted] = self.console.bg[inverted]
+            self.console.bg[inverted] = fg[inverted[plotted]]
+
@@ -0,0 +1,138 @@
+from __future__ import annotations
+import os
+import struct
+import weakref
+from typing import Tuple
+import numpy as np
+import tcod
+
+# BITMAPFILEHEADER, then the start of any BITMAPINFOHEADER version
+_BMP_HEADER = struct.Struct("<2sIHHIIiiHHI")
+_BI_RGB, _BI_BITFIELDS = 0, 3
+
+_shared: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+
+class MappedImage:
+    """MappedImage is a read-only RGB image memory-mapped from a file
+
+    Pixels are only read from the disk when they are accessed, so opening an
+    image is O(1) in time and memory whatever its size, and sampling it only
+    touches the rows it needs. Use MappedImage.open() or MappedImage.raw() to
+    share the mapping between every user of the same file.
+
+    Args:
+        pixels: np.ndarray: a (height, width, 3) uint8 view of the mapping,
+            rows from top to bottom and channels in RGB order
+        path: str: the path of the mapped file
+    """
+
+    def __init__(self, pixels: np.ndarray, path: str = "") -> None:
+        self.pixels = pixels
+        self.path = path
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    @classmethod
+    def open(cls, path: str) -> MappedImage:
+        """map the uncompressed 24 or 32 bits BMP file at path
+
+        Raises:
+            ValueError: if the file is not an uncompressed 24/32 bits BMP
+        """
+        key = ("bmp", os.path.realpath(path))
+        image = _shared.get(key)
+        if image is None:
+            image = cls(_map_bmp(path), path)
+            _shared[key] = image
+        return image
+
+    @classmethod
+    def raw(cls, path: str, width: int, height: int, channels: int = 3,
+            offset: int = 0) -> MappedImage:
+        """map the raw pixels at offset in the file at path, stored row by row
+        from top to bottom, each pixel being R, G, B followed by
+        channels - 3 ignored bytes"""
+        key = ("raw", os.path.realpath(path), width, height, channels, offset)
+        image = _shared.get(key)
+        if image is None:
+            data = np.memmap(path, dtype=np.uint8, mode="r", offset=offset,
+                             shape=(height, width, channels))
+            image = cls(data[..., :3], path)
+            _shared[key] = image
+        return image
+
+    def sample(self, ix: np.ndarray, iy: np.ndarray,
+               footprint: float = 1.) -> Tuple[np.ndarray, np.ndarray]:
+        """get the colors of the image at the pixel coordinates (ix, iy)
+
+        When footprint is greater than 1, each color is the mean of up to 4x4
+        samples spread over the footprint x footprint pixels square starting
+        at (ix, iy), like a mipmap of the matching level would give, but
+        without reading the pixels in between.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: the (..., 3) colors, and the mask of
+                the coordinates inside the image. Colors outside are black.
+        """
+        inside = (0 <= ix) & (ix < self.width) & (0 <= iy) & (iy < self.height)
+        n = int(min(4, max(1, footprint)))
+        offsets = (np.arange(n) + .5) * footprint / n if n > 1 \
+            else np.zeros(1)
+        colors = np.zeros(ix.shape + (3,), dtype=np.uint16)
+        for oy in offsets:
+            rows = np.clip(iy + oy, 0, self.height - 1).astype(np.intp)
+            for ox in offsets:
+                cols = np.clip(ix + ox, 0, self.width - 1).astype(np.intp)
+                colors += self.pixels[rows, cols]
+        colors = (colors // (n*n)).astype(np.uint8)
+        colors[~inside] = 0
+        return colors, inside
+
+    def blit(self, console: tcod.console.Console, x: float, y: float,
+             scale_x: float = 1., scale_y: float = 1.,
+             angle: float = 0.) -> None:
+        """set the background of the console cells covered by the image,
+        centered on (x, y), scaled and rotated like tcod.image.Image.blit
+        with BKGND_SET
+
+        Only the pixels under the cells are read.
+        """
+        cx = np.arange(console.width)[None, :] - x
+        cy = np.arange(console.height)[:, None] - y
+        cos, sin = np.cos(angle), np.sin(angle)
+        ix = (self.width // 2) * 1. + (cx*cos + cy*sin) / scale_x
+        iy = (self.height // 2) * 1. + (cy*cos - cx*sin) / scale_y
+        ix, iy = np.broadcast_arrays(ix, iy)
+        footprint = 1 / min(scale_x, scale_y)
+        colors, inside = self.sample(ix, iy, footprint)
+        console.bg[inside] = colors[inside]
+
+
+def _map_bmp(path: str) -> np.ndarray:
+    with open(path, "rb") as f:
+        header = f.read(_BMP_HEADER.size)
+    if len(header) < _BMP_HEADER.size:
+        raise ValueError(f"{path} is not a BMP file")
+    magic, _, _, _, offset, _, width, height, _, bpp, compression = \
+        _BMP_HEADER.unpack(header)
+    if magic != b"BM":
+        raise ValueError(f"{path} is not a BMP file")
+    if bpp not in (24, 32) or compression not in (_BI_RGB, _BI_BITFIELDS):
+        raise ValueError(f"{path} must be an uncompressed 24 or 32 bits BMP,"
+                         f" not {bpp} bits with compression {compression}")
+    # rows are padded to 4 bytes, and stored bottom-up unless height < 0
+    stride = (bpp*width + 31) // 32 * 4
+    data = np.memmap(path, dtype=np.uint8, mode="r", offset=offset,
+                     shape=(abs(height), stride))
+    pixels = data[:, :width*bpp//8].reshape(abs(height), width, bpp//8)
+    if height > 0:
+        pixels = pixels[::-1]
+    # BGR(A) to RGB
+    return pixels[..., 2::-1]
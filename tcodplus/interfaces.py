@@ -1,9 +1,10 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
 import abc
 import tcod.event
 
 if TYPE_CHECKING:
+    import numpy as np
     from tcodplus.canvas import Canvas
     from tcodplus.event import CanvasDispatcher
 
@@ -41,6 +42,12 @@ class IMouseFocusable(IFocusable):
         pass
 
 
+class IMaskFocusable(IMouseFocusable):
+    @abc.abstractmethod
+    def hit_mask(self) -> np.ndarray:
+        pass
+
+
 class IKeyboardFocusable(IFocusable):
     @property
     @abc.abstractmethod
@@ -77,3 +84,21 @@ class IUpdatable(abc.ABC):
     @abc.abstractmethod
     def update(self) -> None:
         pass
+
+
+class IIncrementalUpdatable(IUpdatable):
+    """An IUpdatable whose update can be spread over several frames.
+
+    update_steps() yields whenever the update may be suspended, and the
+    scheduler of the RootCanvas resumes it on a following frame if the frame
+    budget is spent (see scheduler.UpdateScheduler). The Canvas keeps
+    showing its previous content meanwhile, so update_steps() must only draw
+    in its last step, which redraws the whole console, base included.
+    """
+    @abc.abstractmethod
+    def update_steps(self) -> Iterator[None]:
+        pass
+
+    def update(self) -> None:
+        for _ in self.update_steps():
+            pass
@@ -0,0 +1,293 @@
+"""Vectorized interval arithmetic
+
+An Interval holds arrays of bounds: the i-th interval is [lo[i], hi[i]].
+Every function f of this module returns, for each interval, bounds of the
+values f takes over it, so that plotting only needs one evaluation per
+column whatever the function does between samples. Bounds may be infinite,
+and nan bounds mark empty intervals, e.g. log over negative values.
+
+cont[i] is False when the function may be discontinuous over the i-th
+interval, e.g. 1/x over an interval containing 0 or tan over one containing
+a pole. Bounds are then only an enclosure, and the interval should be split
+to plot the continuous parts on each side.
+
+compile_interval() generates the source of a function evaluating a sympy
+expression with these primitives. The source only needs this module, so it
+can be cached and executed without sympy.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, NamedTuple, Union
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray]
+
+
+class Interval(NamedTuple):
+    lo: ArrayLike
+    hi: ArrayLike
+    cont: ArrayLike = True
+
+
+def const(value: float) -> Interval:
+    return Interval(value, value, True)
+
+
+def _empty_where(mask: ArrayLike, lo: ArrayLike, hi: ArrayLike,
+                 cont: ArrayLike) -> Interval:
+    return Interval(np.where(mask, np.nan, lo), np.where(mask, np.nan, hi),
+                    cont)
+
+
+def _monotonic(f: Callable, a: Interval, increasing: bool = True) -> Interval:
+    with np.errstate(all="ignore"):
+        lo, hi = f(a.lo), f(a.hi)
+    return Interval(lo, hi, a.cont) if increasing \
+        else Interval(hi, lo, a.cont)
+
+
+def add(a: Interval, b: Interval) -> Interval:
+    with np.errstate(invalid="ignore"):
+        return Interval(a.lo + b.lo, a.hi + b.hi, a.cont & b.cont)
+
+
+def neg(a: Interval) -> Interval:
+    return Interval(-a.hi, -a.lo, a.cont)
+
+
+def mul(a: Interval, b: Interval) -> Interval:
+    empty = np.isnan(a.lo) | np.isnan(b.lo)
+    with np.errstate(invalid="ignore"):
+        products = [a.lo*b.lo, a.lo*b.hi, a.hi*b.lo, a.hi*b.hi]
+    # 0 * inf is 0 here: the bounds are limits, not values
+    products = [np.where(np.isnan(p), 0., p) for p in products]
+    lo = np.minimum.reduce(products)
+    hi = np.maximum.reduce(products)
+    return _empty_where(empty, lo, hi, a.cont & b.cont)
+
+
+def recip(a: Interval) -> Interval:
+    """1 / a: unbounded and discontinuous where a strictly contains 0"""
+    pole = (a.lo < 0) & (0 < a.hi)
+    zero = (a.lo == 0) & (a.hi == 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lo = np.where(pole, -np.inf, 1 / a.hi)
+        hi = np.where(pole, np.inf, 1 / a.lo)
+    # 1/[0, h] is [1/h, inf] and 1/[l, 0] is [-inf, 1/l]
+    lo = np.where(a.hi == 0, -np.inf, lo)
+    hi = np.where(a.lo == 0, np.inf, hi)
+    return _empty_where(zero, lo, hi, a.cont & ~pole)
+
+
+def div(a: Interval, b: Interval) -> Interval:
+    return mul(a, recip(b))
+
+
+def ipow(a: Interval, n: int) -> Interval:
+    """a ** n for an integer n"""
+    if n < 0:
+        return recip(ipow(a, -n))
+    if n == 0:
+        return _empty_where(np.isnan(a.lo), 1., 1., a.cont)
+    with np.errstate(over="ignore"):
+        lo, hi = np.power(a.lo, n), np.power(a.hi, n)
+    if n % 2:
+        return Interval(lo, hi, a.cont)
+    straddle = (a.lo < 0) & (0 < a.hi)
+    return Interval(np.where(straddle, 0., np.minimum(lo, hi)),
+                    np.maximum(lo, hi), a.cont)
+
+
+def _clip_domain(a: Interval, low: float, high: float = np.inf) -> Interval:
+    """restrict a to [low, high], empty where they do not intersect"""
+    outside = (a.hi < low) | (a.lo > high)
+    return _empty_where(outside, np.maximum(a.lo, low),
+                        np.minimum(a.hi, high), a.cont)
+
+
+def rpow(a: Interval, e: float) -> Interval:
+    """a ** e for a real non-integer e, defined for a >= 0"""
+    a = _clip_domain(a, 0.)
+    return _monotonic(lambda v: np.power(v, e), a, e > 0)
+
+
+def sqrt(a: Interval) -> Interval:
+    return _monotonic(np.sqrt, _clip_domain(a, 0.))
+
+
+def exp(a: Interval) -> Interval:
+    return _monotonic(np.exp, a)
+
+
+def log(a: Interval) -> Interval:
+    return _monotonic(np.log, _clip_domain(a, 0.))
+
+
+def pow_(a: Interval, b: Interval) -> Interval:
+    """a ** b for a non constant exponent, defined for a > 0"""
+    return exp(mul(b, log(a)))
+
+
+def _contains_periodic(a: Interval, offset: float,
+                       period: float) -> np.ndarray:
+    """whether a contains some offset + k*period"""
+    with np.errstate(invalid="ignore"):
+        k = np.floor((a.hi - offset) / period)
+        return (offset + k*period >= a.lo) | ~np.isfinite(a.hi - a.lo)
+
+
+def cos(a: Interval) -> Interval:
+    with np.errstate(invalid="ignore"):
+        c_lo, c_hi = np.cos(a.lo), np.cos(a.hi)
+    lo = np.where(_contains_periodic(a, np.pi, 2*np.pi), -1.,
+                  np.minimum(c_lo, c_hi))
+    hi = np.where(_contains_periodic(a, 0., 2*np.pi), 1.,
+                  np.maximum(c_lo, c_hi))
+    return _empty_where(np.isnan(a.lo), lo, hi, a.cont)
+
+
+def sin(a: Interval) -> Interval:
+    return cos(add(a, const(-np.pi/2)))
+
+
+def tan(a: Interval) -> Interval:
+    pole = _contains_periodic(a, np.pi/2, np.pi)
+    with np.errstate(invalid="ignore"):
+        lo = np.where(pole, -np.inf, np.tan(a.lo))
+        hi = np.where(pole, np.inf, np.tan(a.hi))
+    return _empty_where(np.isnan(a.lo), lo, hi, a.cont & ~pole)
+
+
+def asin(a: Interval) -> Interval:
+    return _monotonic(np.arcsin, _clip_domain(a, -1., 1.))
+
+
+def acos(a: Interval) -> Interval:
+    return _monotonic(np.arccos, _clip_domain(a, -1., 1.), False)
+
+
+def atan(a: Interval) -> Interval:
+    return _monotonic(np.arctan, a)
+
+
+def sinh(a: Interval) -> Interval:
+    return _monotonic(np.sinh, a)
+
+
+def tanh(a: Interval) -> Interval:
+    return _monotonic(np.tanh, a)
+
+
+def cosh(a: Interval) -> Interval:
+    # cosh is even and increasing over [0, inf]
+    return _monotonic(np.cosh, abs_(a))
+
+
+def abs_(a: Interval) -> Interval:
+    straddle = (a.lo < 0) & (0 < a.hi)
+    lo = np.where(straddle, 0., np.minimum(np.abs(a.lo), np.abs(a.hi)))
+    hi = np.maximum(np.abs(a.lo), np.abs(a.hi))
+    return Interval(lo, hi, a.cont)
+
+
+def _steps(f: Callable, a: Interval) -> Interval:
+    """f(a) for an increasing step function f"""
+    lo, hi = f(a.lo), f(a.hi)
+    with np.errstate(invalid="ignore"):
+        return Interval(lo, hi, a.cont & (lo == hi))
+
+
+def floor(a: Interval) -> Interval:
+    return _steps(np.floor, a)
+
+
+def ceiling(a: Interval) -> Interval:
+    return _steps(np.ceil, a)
+
+
+def sign(a: Interval) -> Interval:
+    return _steps(np.sign, a)
+
+
+def maximum(a: Interval, b: Interval) -> Interval:
+    return Interval(np.maximum(a.lo, b.lo), np.maximum(a.hi, b.hi),
+                    a.cont & b.cont)
+
+
+def minimum(a: Interval, b: Interval) -> Interval:
+    return Interval(np.minimum(a.lo, b.lo), np.minimum(a.hi, b.hi),
+                    a.cont & b.cont)
+
+
+# sympy function name -> name of the function of this module
+_FUNCTIONS = {
+    "exp": "exp", "log": "log", "sin": "sin", "cos": "cos", "tan": "tan",
+    "asin": "asin", "acos": "acos", "atan": "atan", "sinh": "sinh",
+    "cosh": "cosh", "tanh": "tanh", "Abs": "abs_", "floor": "floor",
+    "ceiling": "ceiling", "sign": "sign",
+}
+_VARIADIC = {"Add": "add", "Mul": "mul", "Max": "maximum", "Min": "minimum"}
+
+
+def compile_interval(expr: Any, symbol: Any) -> str:
+    """generate the source of a function _interval(x: Interval) -> Interval
+    evaluating the sympy expression expr of symbol over intervals
+
+    The source must be executed with this module available as "iv".
+
+    Raises:
+        NotImplementedError: if expr uses a function with no interval
+            counterpart here
+    """
+    lines: List[str] = []
+    names: Dict[Any, str] = {symbol: "x"}
+
+    def emit(code: str) -> str:
+        name = f"t{len(lines)}"
+        lines.append(f"    {name} = {code}")
+        return name
+
+    # iterative post-order walk, so deep expressions can not overflow
+    stack = [(expr, False)]
+    while stack:
+        node, visited = stack.pop()
+        if node in names:
+            continue
+        if not visited and node.args and not node.is_Number:
+            stack.append((node, True))
+            stack += [(arg, False) for arg in node.args]
+            continue
+        names[node] = emit(_node_code(node, [names.get(arg)
+                                             for arg in node.args]))
+
+    lines.append(f"    return {names[expr]}")
+    return "def _interval(x):\n" + "\n".join(lines) + "\n"
+
+
+def _node_code(node: Any, args: List[str]) -> str:
+    kind = type(node).__name__
+    if node.is_Number or node.is_NumberSymbol:
+        value = float(node)
+        if not np.isfinite(value):
+            raise NotImplementedError(f"{node} is not a finite number")
+        return f"iv.const({value!r})"
+    if node.is_Symbol:
+        raise NotImplementedError(f"unknown symbol {node}")
+    if kind in _VARIADIC:
+        code = args[0]
+        for arg in args[1:]:
+            code = f"iv.{_VARIADIC[kind]}({code}, {arg})"
+        return code
+    if kind == "Pow":
+        base, e = node.args
+        if e.is_Integer:
+            return f"iv.ipow({args[0]}, {int(e)})"
+        if e == 1/2:
+            return f"iv.sqrt({args[0]})"
+        if e.is_Number:
+            return f"iv.rpow({args[0]}, {float(e)!r})"
+        if type(base).__name__ == "Exp1":
+            return f"iv.exp({args[1]})"
+        return f"iv.pow_({args[0]}, {args[1]})"
+    if kind in _FUNCTIONS and len(args) == 1:
+        return f"iv.{_FUNCTIONS[kind]}({args[0]})"
+    raise NotImplementedError(f"no interval evaluation of {kind}")
@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+import itertools
+import threading
+
+
+class Mailbox:
+    """Mailbox collects changes posted from any thread, to be applied on the
+    thread drawing the Canvas tree.
+
+    A change is a closure run by apply(). Changes posted with the same key
+    are coalesced: only the last one is applied, at the place of the last
+    post, so a producer can post far more often than frames are drawn. The
+    changes without a key are all applied, in posting order.
+
+    Posting sets an Event, so that an idle loop can wait() for changes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, Callable[[], Any]] = {}
+        self._ids = itertools.count()
+        self._event = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def post(self, change: Callable[[], Any],
+             key: Optional[Hashable] = None) -> None:
+        """post a change, replacing the pending one with the same key"""
+        self.post_batch([(key, change)])
+
+    def post_value(self, target: Any, attr: str, value: Any) -> None:
+        """post setting target.attr to value, coalesced by target and attr"""
+        self.post_batch([((id(target), attr),
+                          lambda: setattr(target, attr, value))])
+
+    def post_batch(self, changes: Iterable[Tuple[Optional[Hashable],
+                                                 Callable[[], Any]]]) -> None:
+        """post several (key, change) at once, they are applied on the same
+        frame"""
+        with self._lock:
+            pending = self._pending
+            for key, change in changes:
+                if key is None:
+                    key = ("", next(self._ids))
+                else:
+                    pending.pop(key, None)
+                pending[key] = change
+        if not self._event.is_set():
+            self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """wait for a change to be posted
+
+        Returns:
+            bool: True if a change is pending, False on timeout
+        """
+        return self._event.wait(timeout)
+
+    def apply(self) -> int:
+        """run the pending changes, in order
+
+        If a change raises, the following ones stay pending and the
+        exception is raised.
+
+        Returns:
+            int: the number of changes run
+        """
+        with self._lock:
+            changes, self._pending = self._pending, {}
+            self._event.clear()
+        done = 0
+        items = iter(changes.items())
+        try:
+            for _, change in items:
+                change()
+                done += 1
+        except BaseException:
+            with self._lock:
+                remaining = dict(items)
+                for key, change in self._pending.items():
+                    remaining.pop(key, None)
+                    remaining[key] = change
+                self._pending = remaining
+                if remaining:
+                    self._event.set()
+            raise
+        return done
@@ -0,0 +1,335 @@
+"""Record the frames and the input of a RootCanvas, and play them back
+
+The log is a sequence of records: a frame, a message of stream.FrameEncoder,
+or a batch of events, zlib compressed JSON. Only the frames redrawn are
+recorded, as deltas between keyframes, so that hours of sessions take a few
+MB. On close(), an index of the keyframes is written at the end, so that the
+player can seek to any time by bisection, then decode at most a keyframe
+interval of deltas. A log not closed, e.g. after a crash, is still playable:
+its index is rebuilt by reading it once.
+
+    recorder = record.SessionRecorder("session.tcprec")
+    recorder.attach(root_canvas)
+    ...
+    recorder.close()
+
+    player = record.SessionPlayer("session.tcprec")
+    frame = player.frame_at(player.start + 60)
+"""
+from __future__ import annotations
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, Iterator, \
+    List, Optional, Tuple
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+import tcod.event
+from tcodplus.stream import FrameDecoder, FrameEncoder, KEYFRAME, \
+    parse_header, console_frame
+from tcodplus.terminal import Frame
+
+if TYPE_CHECKING:
+    from tcodplus.canvas import RootCanvas
+
+MAGIC = b"TCPREC1\n"
+FRAME = 0
+EVENTS = 1
+
+_RECORD = struct.Struct("<BI")
+# keyframe index: (time, offset) pairs
+_INDEX_DTYPE = np.dtype([("time", "<f8"), ("offset", "<u8")])
+# trailer: offset of the index, number of entries, magic
+_TRAILER = struct.Struct("<QQ8s")
+_INDEX_MAGIC = b"TCPRIDX\n"
+
+# the attributes of tcod events which are recorded
+_EVENT_ATTRS = ("sym", "scancode", "mod", "repeat", "text", "tile",
+                "pixel", "tile_motion", "pixel_motion", "state", "button",
+                "x", "y", "flipped")
+
+
+def event_record(event: tcod.event.Event, timestamp: float
+                 ) -> Dict[str, Any]:
+    """get the JSON serializable record of an event"""
+    record: Dict[str, Any] = {"type": event.type, "time": timestamp}
+    for attr in _EVENT_ATTRS:
+        value = getattr(event, attr, None)
+        if value is None:
+            continue
+        if isinstance(value, tuple):
+            value = [int(v) for v in value]
+        elif not isinstance(value, (bool, int, float, str)):
+            continue
+        record[attr] = value
+    return record
+
+
+class SessionRecorder:
+    """SessionRecorder writes the frames and events of a RootCanvas to a log
+
+    The hooks only copy the frame or the event and queue them: encoding,
+    compression and writing happen on a writer thread.
+
+    Args:
+        path: str: the log file, overwritten
+        keyframe_interval: int: the number of frames between keyframes,
+            bounding the work of a seek
+        events_interval: float: events are written in batches, at most every
+            events_interval seconds
+    """
+
+    def __init__(self, path: str, keyframe_interval: int = 600,
+                 events_interval: float = 1.) -> None:
+        self.path = path
+        self.encoder = FrameEncoder(keyframe_interval, level=6)
+        self.events_interval = events_interval
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(MAGIC)
+        self._index: List[Tuple[float, int]] = []
+        self._queue: queue.Queue = queue.Queue()
+        self._events: List[Dict[str, Any]] = []
+        self._events_time = 0.
+        # offset of the first events record written since the last frame
+        self._events_offset: Optional[int] = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._write, daemon=True,
+                                        name="tcodplus-recorder")
+        self._thread.start()
+
+    def attach(self, root: RootCanvas) -> None:
+        """record the frames and the events of root"""
+        root.on_refresh.append(self._on_refresh)
+        root.on_event.append(self._on_event)
+
+    def detach(self, root: RootCanvas) -> None:
+        root.on_refresh.remove(self._on_refresh)
+        root.on_event.remove(self._on_event)
+
+    def _on_refresh(self, root: RootCanvas, up: bool) -> None:
+        if up:
+            self.record_frame(root.console)
+
+    def _on_event(self, root: RootCanvas, event: tcod.event.Event) -> None:
+        self.record_event(event)
+
+    def record_frame(self, console: tcod.console.Console,
+                     timestamp: Optional[float] = None) -> None:
+        self._queue.put((FRAME, console_frame(console), time.time()
+                         if timestamp is None else timestamp))
+
+    def record_event(self, event: tcod.event.Event,
+                     timestamp: Optional[float] = None) -> None:
+        self._queue.put((EVENTS, event_record(event, time.time()
+                                              if timestamp is None
+                                              else timestamp), None))
+
+    def _write_record(self, kind: int, data: bytes) -> int:
+        offset = self._file.tell()
+        self._file.write(_RECORD.pack(kind, len(data)))
+        self._file.write(data)
+        return offset
+
+    def _flush_events(self) -> None:
+        if self._events:
+            data = zlib.compress(json.dumps(self._events,
+                                            separators=(",", ":")).encode())
+            offset = self._write_record(EVENTS, data)
+            if self._events_offset is None:
+                self._events_offset = offset
+            self._events = []
+
+    def _write(self) -> None:
+        try:
+            while True:
+                kind, item, timestamp = self._queue.get()
+                if kind is None:
+                    break
+                if kind == EVENTS:
+                    if not self._events:
+                        self._events_time = item["time"]
+                    self._events.append(item)
+                    if item["time"] - self._events_time \
+                            >= self.events_interval:
+                        self._flush_events()
+                    continue
+                # events come before the frame they led to
+                self._flush_events()
+                message = self.encoder.encode(item, timestamp)
+                offset = self._write_record(FRAME, message)
+                if parse_header(message).kind == KEYFRAME:
+                    # a seek reads the events which led to the keyframe too
+                    if self._events_offset is not None:
+                        offset = self._events_offset
+                    self._index.append((timestamp, offset))
+                self._events_offset = None
+        except BaseException as error:
+            self._error = error
+
+    def close(self) -> None:
+        """write the pending records and the index, and close the log"""
+        if self._file.closed:
+            return
+        self._queue.put((None, None, None))
+        self._thread.join()
+        try:
+            if self._error is None:
+                self._flush_events()
+                index = np.array(self._index, dtype=_INDEX_DTYPE)
+                offset = self._file.tell()
+                self._file.write(index.tobytes())
+                self._file.write(_TRAILER.pack(offset, len(index),
+                                               _INDEX_MAGIC))
+        finally:
+            self._file.close()
+        if self._error is not None:
+            raise self._error
+
+
+class SessionPlayer:
+    """SessionPlayer reads a log written by a SessionRecorder
+
+    The events replayed by replay() are given to the on_event callbacks of
+    the player, as the dictionaries of event_record().
+
+    Args:
+        path: str: the log file
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file: BinaryIO = open(path, "rb")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a tcodplus session log")
+        self._end = os.path.getsize(path)
+        self.index = self._read_index()
+        if self.index is None:
+            self.index = self._scan_index()
+        self._times = self.index["time"].tolist()
+        self.decoder = FrameDecoder()
+        self.on_event: List[Callable[[Dict[str, Any]], None]] = []
+
+    def _read_index(self) -> Optional[np.ndarray]:
+        if self._end < len(MAGIC) + _TRAILER.size:
+            return None
+        self._file.seek(self._end - _TRAILER.size)
+        offset, count, magic = _TRAILER.unpack(self._file.read(_TRAILER.size))
+        if magic != _INDEX_MAGIC:
+            return None
+        self._file.seek(offset)
+        index = np.frombuffer(self._file.read(count * _INDEX_DTYPE.itemsize),
+                              _INDEX_DTYPE)
+        self._end = offset
+        return index
+
+    def _scan_index(self) -> np.ndarray:
+        """rebuild the index of a log which was not closed"""
+        index = []
+        events_offset = None
+        for offset, kind, data in self._records(len(MAGIC)):
+            if kind == EVENTS:
+                if events_offset is None:
+                    events_offset = offset
+                continue
+            header = parse_header(data)
+            if header.kind == KEYFRAME:
+                index.append((header.time, offset if events_offset is None
+                              else events_offset))
+            events_offset = None
+        return np.array(index, dtype=_INDEX_DTYPE)
+
+    def _records(self, offset: int) -> Iterator[Tuple[int, int, bytes]]:
+        """yield the (offset, kind, data) of the records from offset, up to
+        the index or the last complete record"""
+        self._file.seek(offset)
+        while offset + _RECORD.size <= self._end:
+            kind, size = _RECORD.unpack(self._file.read(_RECORD.size))
+            if offset + _RECORD.size + size > self._end:
+                return
+            data = self._file.read(size)
+            yield offset, kind, data
+            offset += _RECORD.size + size
+            self._file.seek(offset)
+
+    @property
+    def start(self) -> float:
+        """the time of the first frame"""
+        return self._times[0] if self._times else 0.
+
+    def records(self, t: float = float("-inf")
+                ) -> Iterator[Tuple[float, Optional[Frame],
+                                    List[Dict[str, Any]]]]:
+        """replay the log from the last keyframe at or before t
+
+        Yields:
+            (time, frame, events): for each frame, its time and its arrays,
+                updated in place, with the events recorded before it. The
+                events following the last frame come with a None frame.
+        """
+        if not self._times:
+            return
+        i = max(bisect_right(self._times, t) - 1, 0)
+        self.decoder = FrameDecoder()
+        events: List[Dict[str, Any]] = []
+        for _, kind, data in self._records(int(self.index["offset"][i])):
+            if kind == EVENTS:
+                events += json.loads(zlib.decompress(data))
+            elif kind == FRAME:
+                frame = self.decoder.decode(data)
+                yield self.decoder.header.time, frame, events
+                events = []
+        if events:
+            yield events[-1]["time"], None, events
+
+    def frame_at(self, t: float) -> Optional[Frame]:
+        """get the frame shown at time t, None before the first one"""
+        frame = None
+        for frame_time, current, _ in self.records(t):
+            if frame_time > t:
+                break
+            if current is not None:
+                frame = tuple(a.copy() for a in current)
+        return frame
+
+    def replay(self, root: RootCanvas, t: float = float("-inf"),
+               speed: float = 1.) -> None:
+        """play the log from time t into a headless RootCanvas of the
+        recorded size, in real time divided by speed, flushing it after each
+        frame. The recorded events are given to the on_event callbacks of
+        the player."""
+        clock_start = time.perf_counter()
+        log_start = None
+        for frame_time, frame, events in self.records(t):
+            if frame_time < t:
+                if frame is not None:
+                    _copy_frame(root.console, frame)
+                continue
+            if log_start is None:
+                # show the frame at t right away
+                root.flush()
+                log_start = frame_time
+            delay = (frame_time - log_start) / speed \
+                - (time.perf_counter() - clock_start)
+            if delay > 0:
+                time.sleep(delay)
+            for event in events:
+                for callback in self.on_event:
+                    callback(event)
+            if frame is not None:
+                _copy_frame(root.console, frame)
+                root.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _copy_frame(console: tcod.console.Console, frame: Frame) -> None:
+    ch, fg, bg = frame
+    console.ch[...] = ch
+    console.fg[...] = fg
+    console.bg[...] = bg
@@ -0,0 +1,108 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tcodplus.canvas import Canvas
+
+
+class CanvasRegistry:
+    """CanvasRegistry indexes the offsprings of a root Canvas
+
+    Offsprings are indexed by name, by path and by type. The path of a Canvas
+    is the '/' separated names of its ancestors, starting from the childs of
+    the root, followed by its own name, e.g. "rpanel/EDIT_panel/field_fun".
+
+    The registry is kept in sync by the root Canvas each time the childs of
+    one of its offsprings change.
+
+    Args:
+        root: Canvas: the root of the indexed tree
+    """
+
+    def __init__(self, root: Canvas) -> None:
+        self.root = root
+        self._by_path: Dict[str, Canvas] = {}
+        self._paths: Dict[int, str] = {}
+        self._by_name: Dict[str, Dict[int, Canvas]] = {}
+        self._by_type: Dict[type, Dict[int, Canvas]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_path)
+
+    def __contains__(self, canvas: Canvas) -> bool:
+        return id(canvas) in self._paths
+
+    def register(self, canvas: Canvas) -> None:
+        """index canvas and all its offsprings"""
+        parent = canvas.parent
+        prefix = "" if parent is self.root else f"{self._paths[id(parent)]}/"
+        stack = [(canvas, prefix)]
+        while stack:
+            c, prefix = stack.pop()
+            path = f"{prefix}{c.name}"
+            self._by_path[path] = c
+            self._paths[id(c)] = path
+            self._by_name.setdefault(c.name, {})[id(c)] = c
+            self._by_type.setdefault(type(c), {})[id(c)] = c
+            stack += [(child, f"{path}/") for child in c.childs.values()]
+
+    def unregister(self, canvas: Canvas) -> None:
+        """remove canvas and all its offsprings from the indexes"""
+        stack = [canvas]
+        while stack:
+            c = stack.pop()
+            path = self._paths.pop(id(c), None)
+            if path is None:
+                continue
+            del self._by_path[path]
+            for index, key in ((self._by_name, c.name),
+                               (self._by_type, type(c))):
+                entries = index[key]
+                del entries[id(c)]
+                if not entries:
+                    del index[key]
+            stack += c.childs.values()
+
+    def get(self, path: str) -> Canvas:
+        """get the Canvas at path
+
+        Raises:
+            KeyError: if there is no Canvas at path
+        """
+        return self._by_path[path.strip("/")]
+
+    def path(self, canvas: Canvas) -> str:
+        return self._paths[id(canvas)]
+
+    def find(self, name: str) -> Optional[Canvas]:
+        """get the first registered Canvas named name, None if there is none"""
+        return next(iter(self._by_name.get(name, {}).values()), None)
+
+    def find_all(self, name: str) -> List[Canvas]:
+        return list(self._by_name.get(name, {}).values())
+
+    def select(self, type_: Optional[type] = None,
+               **style_attrs: Any) -> List[Canvas]:
+        """get the registered Canvas matching every given criteria
+
+        Args:
+            type_: Optional[type]: if set, only the instances of type_, or of
+                one of its subclasses, are selected
+            style_attrs: the Style attributes the current styles of the
+                selected Canvas must be equal to
+
+        Returns:
+            List[Canvas]: the selected Canvas
+        """
+        if type_ is None:
+            candidates = list(self._by_path.values())
+        else:
+            candidates = [c for t, entries in self._by_type.items()
+                          if issubclass(t, type_) for c in entries.values()]
+        if style_attrs:
+            def match(c: Canvas) -> bool:
+                style = c.styles()
+                return all(getattr(style, k) == v
+                           for k, v in style_attrs.items())
+            candidates = [c for c in candidates if match(c)]
+        return candidates
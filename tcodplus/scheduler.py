@@ -0,0 +1,85 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Collection, Dict, Iterable, \
+    Iterator, List, Tuple
+import time
+
+if TYPE_CHECKING:
+    from tcodplus.canvas import Canvas
+
+
+class UpdateScheduler:
+    """UpdateScheduler runs the update_steps() of IIncrementalUpdatable
+    canvases within a time budget per frame.
+
+    Each frame, the visible canvases to update are given to run(), which
+    resumes their steps in priority order until the budget is spent: the
+    focused canvases come first, then the others from the longest waiting.
+    The unfinished ones are resumed on the next frames, the hidden ones once
+    they are visible again, so that a slow update never delays the frame by
+    more than about the budget and a step.
+
+    At least one step is run per frame, so updates always progress.
+
+    Args:
+        budget: float: the time spent updating per frame, in seconds
+        clock: Callable[[], float]: the clock measuring it
+    """
+
+    def __init__(self, budget: float = 1/120,
+                 clock: Callable[[], float] = time.perf_counter) -> None:
+        self.budget = budget
+        self.clock = clock
+        # canvas -> (its running steps, frame it started waiting)
+        self._tasks: Dict[Canvas, Tuple[Iterator[None], int]] = {}
+        self._frame = 0
+
+    def pending(self, canvas: Canvas) -> bool:
+        """whether canvas has an unfinished update"""
+        return canvas in self._tasks
+
+    def cancel(self, canvas: Canvas) -> None:
+        """drop the unfinished update of canvas, if any"""
+        self._tasks.pop(canvas, None)
+
+    def run(self, canvases: Iterable[Canvas],
+            restart: Collection[Canvas] = (),
+            focused: Collection[Canvas] = ()) -> List[Canvas]:
+        """run the steps of canvases for at most one frame budget
+
+        Args:
+            canvases: Iterable[Canvas]: the canvases to update, each starts
+                its update_steps() unless it is pending
+            restart: Collection[Canvas]: the canvases whose pending update
+                is stale, e.g. because they were resized, and starts over
+            focused: Collection[Canvas]: the canvases to update first
+
+        Returns:
+            List[Canvas]: the canvases whose update finished, and drew them
+        """
+        self._frame += 1
+        canvases = list(canvases)
+        for c in canvases:
+            if c in restart or c not in self._tasks:
+                waiting = self._tasks.get(c, (None, self._frame))[1]
+                self._tasks[c] = (c.update_steps(), waiting)
+        order = sorted(canvases, key=lambda c: (c not in focused,
+                                                self._tasks[c][1]))
+
+        finished = []
+        deadline = self.clock() + self.budget
+        for c in order:
+            steps = self._tasks[c][0]
+            try:
+                while True:
+                    next(steps)
+                    if self.clock() >= deadline:
+                        return finished
+            except StopIteration:
+                del self._tasks[c]
+                finished.append(c)
+            except BaseException:
+                del self._tasks[c]
+                raise
+            if self.clock() >= deadline:
+                break
+        return finished
@@ -0,0 +1,429 @@
+"""Stream the frames of a RootCanvas to remote viewers
+
+Frames are (ch, fg, bg) copies of the root console. FrameEncoder turns each
+one into a message: a keyframe holding the whole console, or a delta holding
+the runs of cells changed since the previous frame, zlib compressed. A
+keyframe is sent periodically, so the size of the stream follows the rate
+of changes, not the size of the console.
+
+FrameServer encodes the frames on its own thread and serves them to any
+number of viewers over TCP, and FrameClient reconstructs them:
+
+    server = stream.FrameServer(port=7777)
+    server.attach(root_canvas)
+
+    python -m tcodplus.stream localhost:7777
+
+Message layout, little endian: a header (kind: u8, index: u32, time: f64,
+width: u16, height: u16, size: u32) followed by size bytes of zlib data.
+A keyframe holds ch as u32, fg then bg as u8 triplets, in row-major order.
+A delta holds the number of runs (u32), the (start, length) of each run as
+u32 pairs of flat cell indices, then the ch, fg and bg of their cells.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, BinaryIO, Iterator, List, NamedTuple, \
+    Optional, Tuple
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+import zlib
+import numpy as np
+import tcod
+from tcodplus.terminal import AnsiTerminal, Frame, frame_diff
+
+if TYPE_CHECKING:
+    from tcodplus.canvas import RootCanvas
+
+KEYFRAME = 0
+DELTA = 1
+
+_HEADER = struct.Struct("<BIdHHI")
+HEADER_SIZE = _HEADER.size
+_COUNT = struct.Struct("<I")
+
+
+class Header(NamedTuple):
+    kind: int
+    index: int
+    time: float
+    width: int
+    height: int
+    size: int
+
+
+def parse_header(data: bytes) -> Header:
+    """read the header at the start of a message"""
+    return Header(*_HEADER.unpack_from(data))
+
+
+def console_frame(console: tcod.console.Console) -> Frame:
+    """copy the (ch, fg, bg) arrays of console"""
+    return console.ch.copy(), console.fg.copy(), console.bg.copy()
+
+
+class FrameEncoder:
+    """FrameEncoder encodes successive frames into messages, see the module
+    documentation.
+
+    Args:
+        keyframe_interval: int: a keyframe is encoded every
+            keyframe_interval frames, and whenever the size changes
+        level: int: the zlib compression level
+    """
+
+    def __init__(self, keyframe_interval: int = 120, level: int = 1) -> None:
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self.index = 0
+        self._previous: Optional[Frame] = None
+        self._since_keyframe = 0
+
+    def reset(self) -> None:
+        """make the next frame a keyframe"""
+        self._previous = None
+
+    def encode(self, frame: Frame, timestamp: Optional[float] = None,
+               keyframe: bool = False) -> bytes:
+        """encode frame, a keyframe if asked, needed or due
+
+        The frame must not be modified afterwards, it is kept to encode the
+        next one.
+        """
+        ch, fg, bg = frame
+        previous = self._previous
+        if keyframe or previous is None or previous[0].shape != ch.shape \
+                or self._since_keyframe >= self.keyframe_interval:
+            message = self.keyframe(frame, timestamp)
+        else:
+            changed = np.flatnonzero(frame_diff(previous, frame))
+            if len(changed):
+                breaks = np.flatnonzero(np.diff(changed) > 1)
+                starts = changed[np.concatenate(([0], breaks + 1))]
+                ends = changed[np.concatenate((breaks, [len(changed) - 1]))]
+                runs = np.stack([starts, ends - starts + 1], axis=1)
+            else:
+                runs = np.zeros((0, 2), dtype=np.intp)
+            payload = b"".join([
+                _COUNT.pack(len(runs)),
+                runs.astype("<u4").tobytes(),
+                ch.ravel()[changed].astype("<u4").tobytes(),
+                fg.reshape(-1, 3)[changed].tobytes(),
+                bg.reshape(-1, 3)[changed].tobytes()])
+            message = self._message(DELTA, self.index, timestamp, ch, payload)
+            self.index += 1
+            self._since_keyframe += 1
+        self._previous = frame
+        return message
+
+    def keyframe(self, frame: Frame, timestamp: Optional[float] = None
+                 ) -> bytes:
+        """encode frame as a keyframe, the next deltas being relative to it
+        """
+        message = self._message(KEYFRAME, self.index, timestamp, frame[0],
+                                self._keyframe_payload(frame))
+        self.index += 1
+        self._previous = frame
+        self._since_keyframe = 0
+        return message
+
+    def snapshot(self, timestamp: Optional[float] = None) -> Optional[bytes]:
+        """encode the last frame again as a keyframe, e.g. for a viewer
+        joining the stream, without changing the encoder state
+
+        Returns:
+            Optional[bytes]: the keyframe, None if no frame was encoded
+        """
+        if self._previous is None:
+            return None
+        return self._message(KEYFRAME, self.index - 1, timestamp,
+                             self._previous[0],
+                             self._keyframe_payload(self._previous))
+
+    @staticmethod
+    def _keyframe_payload(frame: Frame) -> bytes:
+        ch, fg, bg = frame
+        return b"".join([ch.astype("<u4").tobytes(),
+                         np.ascontiguousarray(fg).tobytes(),
+                         np.ascontiguousarray(bg).tobytes()])
+
+    def _message(self, kind: int, index: int, timestamp: Optional[float],
+                 ch: np.ndarray, payload: bytes) -> bytes:
+        height, width = ch.shape
+        data = zlib.compress(payload, self.level)
+        header = _HEADER.pack(kind, index, time.time()
+                              if timestamp is None else timestamp,
+                              width, height, len(data))
+        return header + data
+
+
+class FrameDecoder:
+    """FrameDecoder reconstructs the frames from the messages of a
+    FrameEncoder. Deltas received before the first keyframe are skipped."""
+
+    def __init__(self) -> None:
+        self.frame: Optional[Frame] = None
+        self.header: Optional[Header] = None
+
+    def decode(self, message: bytes) -> Optional[Frame]:
+        """apply a message
+
+        Returns:
+            Optional[Frame]: the current frame, None until a keyframe was
+                decoded. Its arrays are updated in place by the next
+                messages.
+        """
+        header = parse_header(message)
+        payload = zlib.decompress(message[HEADER_SIZE:
+                                          HEADER_SIZE + header.size])
+        n_cells = header.width * header.height
+        if header.kind == KEYFRAME:
+            ch = np.frombuffer(payload, "<u4", n_cells)
+            colors = np.frombuffer(payload, np.uint8, 6 * n_cells,
+                                   4 * n_cells)
+            shape = (header.height, header.width)
+            self.frame = (ch.astype(np.intc).reshape(shape),
+                          colors[:3*n_cells].reshape(shape + (3,)).copy(),
+                          colors[3*n_cells:].reshape(shape + (3,)).copy())
+        elif header.kind == DELTA and self.frame is not None:
+            n_runs, = _COUNT.unpack_from(payload)
+            runs = np.frombuffer(payload, "<u4", 2 * n_runs,
+                                 _COUNT.size).reshape(-1, 2).astype(np.intp)
+            starts, lengths = runs[:, 0], runs[:, 1]
+            n = int(lengths.sum())
+            # flat index of each changed cell, run after run
+            offsets = np.cumsum(lengths) - lengths
+            cells = np.repeat(starts - offsets, lengths) + np.arange(n)
+            pos = _COUNT.size + 8 * n_runs
+            ch, fg, bg = self.frame
+            ch.ravel()[cells] = np.frombuffer(payload, "<u4", n, pos)
+            pos += 4 * n
+            fg.reshape(-1, 3)[cells] = np.frombuffer(
+                payload, np.uint8, 3 * n, pos).reshape(-1, 3)
+            bg.reshape(-1, 3)[cells] = np.frombuffer(
+                payload, np.uint8, 3 * n, pos + 3 * n).reshape(-1, 3)
+        self.header = header
+        return self.frame
+
+
+def read_message(stream: BinaryIO) -> Optional[bytes]:
+    """read a message from a file-like object, None at its end"""
+    header = stream.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        return None
+    data = stream.read(parse_header(header).size)
+    if len(data) < parse_header(header).size:
+        return None
+    return header + data
+
+
+class _Viewer:
+    """a connection to a viewer, with its own writer thread so that a slow
+    viewer never blocks the others"""
+
+    def __init__(self, sock: socket.socket, max_pending: int) -> None:
+        self.sock = sock
+        self.needs_keyframe = True
+        self.closed = False
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._write, daemon=True,
+                                        name="tcodplus-stream-viewer")
+        self._thread.start()
+
+    def send(self, message: bytes) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            # too far behind: drop what it did not get, restart from a
+            # keyframe
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.needs_keyframe = True
+
+    def _write(self) -> None:
+        try:
+            while True:
+                message = self._queue.get()
+                if message is None:
+                    break
+                self.sock.sendall(message)
+        except OSError:
+            pass
+        self.closed = True
+        self.sock.close()
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            self.sock.close()
+
+
+class FrameServer:
+    """FrameServer streams frames to the viewers connected to it.
+
+    submit() only copies the frame and hands it to the encoder thread: if
+    frames are submitted faster than they are encoded, only the latest one
+    is. Each viewer starts with a keyframe, then receives the deltas. A
+    viewer too far behind skips to a new keyframe.
+
+    Args:
+        host: str: the address to listen on, local only by default
+        port: int: the port to listen on, any free one if 0, see address
+        keyframe_interval: int: see FrameEncoder
+        max_pending: int: the messages a viewer may lag behind
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 keyframe_interval: int = 120, max_pending: int = 64) -> None:
+        self.encoder = FrameEncoder(keyframe_interval)
+        self.max_pending = max_pending
+        self._listener = socket.create_server((host, port))
+        self.address: Tuple[str, int] = self._listener.getsockname()[:2]
+        self._viewers: List[_Viewer] = []
+        self._lock = threading.Lock()
+        self._frame: Optional[Tuple[Frame, float]] = None
+        self._wake = threading.Condition(self._lock)
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._accept, daemon=True,
+                             name="tcodplus-stream-accept"),
+            threading.Thread(target=self._encode, daemon=True,
+                             name="tcodplus-stream-encode")]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def viewers(self) -> int:
+        with self._lock:
+            return sum(not v.closed for v in self._viewers)
+
+    def attach(self, root: RootCanvas) -> None:
+        """stream the frames of root, after each refresh() redrawing it"""
+        root.on_refresh.append(self._on_refresh)
+
+    def detach(self, root: RootCanvas) -> None:
+        root.on_refresh.remove(self._on_refresh)
+
+    def _on_refresh(self, root: RootCanvas, up: bool) -> None:
+        if up:
+            self.submit(root.console)
+
+    def submit(self, console: tcod.console.Console,
+               timestamp: Optional[float] = None) -> None:
+        """stream the current content of console"""
+        if not self._viewers:
+            return
+        frame = console_frame(console)
+        with self._wake:
+            self._frame = (frame, time.time() if timestamp is None
+                           else timestamp)
+            self._wake.notify()
+
+    def _accept(self) -> None:
+        while self._running:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                break
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._viewers.append(_Viewer(sock, self.max_pending))
+
+    def _encode(self) -> None:
+        while True:
+            with self._wake:
+                while self._running and self._frame is None:
+                    self._wake.wait()
+                if not self._running:
+                    break
+                (frame, timestamp), self._frame = self._frame, None
+                self._viewers = [v for v in self._viewers if not v.closed]
+                viewers = list(self._viewers)
+            if not viewers:
+                self.encoder.reset()
+                continue
+            message = self.encoder.encode(frame, timestamp)
+            keyframe = None
+            for viewer in viewers:
+                if viewer.needs_keyframe:
+                    # a new or lagging viewer starts over from this frame
+                    if keyframe is None:
+                        keyframe = self.encoder.snapshot(timestamp)
+                    viewer.needs_keyframe = False
+                    viewer.send(keyframe)
+                else:
+                    viewer.send(message)
+
+    def close(self) -> None:
+        """stop serving and disconnect the viewers"""
+        with self._wake:
+            self._running = False
+            self._wake.notify()
+            viewers, self._viewers = self._viewers, []
+        self._listener.close()
+        for viewer in viewers:
+            viewer.close()
+
+
+class FrameClient:
+    """FrameClient receives the frames of a FrameServer
+
+    Args:
+        host: str: the address of the server
+        port: int: its port
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self.sock = socket.create_connection((host, port))
+        self._stream = self.sock.makefile("rb")
+        self.decoder = FrameDecoder()
+
+    def frames(self) -> Iterator[Frame]:
+        """yield the frame after each message, until the server closes the
+        connection. The arrays are updated in place."""
+        while True:
+            message = read_message(self._stream)
+            if message is None:
+                return
+            frame = self.decoder.decode(message)
+            if frame is not None:
+                yield frame
+
+    def close(self) -> None:
+        self._stream.close()
+        self.sock.close()
+
+
+def view(host: str, port: int, terminal: Optional[AnsiTerminal] = None
+         ) -> None:
+    """show the frames of a FrameServer on a terminal"""
+    terminal = terminal if terminal is not None else AnsiTerminal()
+    client = FrameClient(host, port)
+    console = None
+    try:
+        for ch, fg, bg in client.frames():
+            height, width = ch.shape
+            if console is None or console.ch.shape != ch.shape:
+                console = tcod.console.Console(width, height)
+            console.ch[...] = ch
+            console.fg[...] = fg
+            console.bg[...] = bg
+            terminal.present(console)
+    finally:
+        client.close()
+        terminal.close()
+
+
+if __name__ == "__main__":
+    host, _, port = sys.argv[1].rpartition(":")
+    try:
+        view(host or "127.0.0.1", int(port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,168 @@
+"""Render a console to a terminal with ANSI escape sequences
+
+AnsiTerminal draws the root console of a headless RootCanvas to a TTY, e.g.
+over SSH. Each frame is diffed against the previous one with NumPy, and only
+the changed cells are written, with the shortest cursor moves and only the
+color changes, so the output scales with what changed, not with the size of
+the console.
+"""
+from __future__ import annotations
+from typing import BinaryIO, List, Optional, Tuple
+import os
+import sys
+import numpy as np
+import tcod
+import tcod.tileset
+
+# glyph codes below 256 are drawn with the code page 437 of the tcod fonts,
+# where 226-232 are the tcod sub-cell characters
+_CP437 = [chr(c) for c in tcod.tileset.CHARMAP_CP437]
+_CP437[0] = " "
+for _code, _char in ((tcod.CHAR_SUBP_NW, "▘"),
+                     (tcod.CHAR_SUBP_NE, "▝"),
+                     (tcod.CHAR_SUBP_N, "▀"),
+                     (tcod.CHAR_SUBP_SE, "▗"),
+                     (tcod.CHAR_SUBP_DIAG, "▚"),
+                     (tcod.CHAR_SUBP_E, "▐"),
+                     (tcod.CHAR_SUBP_SW, "▖")):
+    _CP437[_code] = _char
+
+# unchanged cells between two changed ones are rewritten rather than skipped
+# when it is shorter than moving the cursor
+MAX_GAP = 4
+
+CSI = "\x1b["
+
+Frame = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def glyph(code: int) -> str:
+    """the unicode character displaying the glyph code of a console cell"""
+    return _CP437[code] if 0 <= code < 256 else chr(code)
+
+
+def frame_diff(previous: Frame, current: Frame) -> np.ndarray:
+    """get the (height, width) mask of the cells differing between two
+    (ch, fg, bg) frames"""
+    (p_ch, p_fg, p_bg), (ch, fg, bg) = previous, current
+    return (p_ch != ch) | (p_fg != fg).any(axis=2) | (p_bg != bg).any(axis=2)
+
+
+class AnsiTerminal:
+    """AnsiTerminal writes frames of a console to a terminal.
+
+    The first frame, and the one following a resize or reset(), redraws the
+    whole console. The next ones only write the cells that changed since the
+    previous frame. Colors are written as 24 bits SGR sequences.
+
+    Args:
+        output: Optional[BinaryIO]: where the escape sequences are written,
+            the standard output by default
+        alternate_screen: bool: whether to draw on the alternate screen of
+            the terminal, restoring its content on close()
+    """
+
+    def __init__(self, output: Optional[BinaryIO] = None,
+                 alternate_screen: bool = True) -> None:
+        self.output = output if output is not None else sys.stdout.buffer
+        self.alternate_screen = alternate_screen
+        self._previous: Optional[Frame] = None
+        self._started = False
+        self.bytes_written = 0
+
+    @staticmethod
+    def size() -> Tuple[int, int]:
+        """the (width, height) of the terminal, in cells"""
+        size = os.get_terminal_size() if sys.stdout.isatty() \
+            else os.terminal_size((80, 24))
+        return size.columns, size.lines
+
+    def reset(self) -> None:
+        """make the next frame redraw the whole console"""
+        self._previous = None
+
+    def encode(self, console: tcod.console.Console) -> str:
+        """get the escape sequences updating the terminal from the previous
+        frame to console, and make console the previous frame"""
+        ch, fg, bg = console.ch, console.fg, console.bg
+        out: List[str] = []
+        previous = self._previous
+        if previous is None or previous[0].shape != ch.shape:
+            out.append(f"{CSI}0m{CSI}2J")
+            changed = np.ones(ch.shape, dtype=bool)
+        else:
+            changed = frame_diff(previous, (ch, fg, bg))
+        self._previous = (ch.copy(), fg.copy(), bg.copy())
+
+        rows = np.flatnonzero(changed.any(axis=1))
+        if not len(rows):
+            return ""
+        cursor: Optional[Tuple[int, int]] = None
+        colors = None
+        for y in rows.tolist():
+            xs = np.flatnonzero(changed[y])
+            # runs of changed cells, bridging the small gaps
+            breaks = np.flatnonzero(np.diff(xs) > MAX_GAP + 1)
+            starts = np.concatenate(([xs[0]], xs[breaks + 1])).tolist()
+            ends = np.concatenate((xs[breaks], [xs[-1]])).tolist()
+            for x0, x1 in zip(starts, ends):
+                out.append(self._move(cursor, x0, y))
+                run_ch = ch[y, x0:x1+1].tolist()
+                run_fg = fg[y, x0:x1+1].tolist()
+                run_bg = bg[y, x0:x1+1].tolist()
+                for code, cell_fg, cell_bg in zip(run_ch, run_fg, run_bg):
+                    cell_colors = (cell_fg, cell_bg)
+                    if cell_colors != colors:
+                        out.append(self._sgr(colors, cell_fg, cell_bg))
+                        colors = cell_colors
+                    out.append(glyph(code))
+                cursor = (x1 + 1, y)
+        out.append(f"{CSI}{ch.shape[0]};1H")
+        return "".join(out)
+
+    @staticmethod
+    def _move(cursor: Optional[Tuple[int, int]], x: int, y: int) -> str:
+        if cursor == (x, y):
+            return ""
+        absolute = f"{CSI}{y+1};{x+1}H"
+        if cursor is not None and cursor[1] == y and cursor[0] < x:
+            relative = f"{CSI}{x-cursor[0]}C"
+            if len(relative) < len(absolute):
+                return relative
+        return absolute
+
+    @staticmethod
+    def _sgr(colors: Optional[Tuple[List[int], List[int]]], fg: List[int],
+             bg: List[int]) -> str:
+        params = []
+        if colors is None or colors[0] != fg:
+            params.append("38;2;%d;%d;%d" % tuple(fg))
+        if colors is None or colors[1] != bg:
+            params.append("48;2;%d;%d;%d" % tuple(bg))
+        return f"{CSI}{';'.join(params)}m"
+
+    def present(self, console: tcod.console.Console) -> int:
+        """write the changes of console since the previous frame
+
+        Returns:
+            int: the number of bytes written
+        """
+        if not self._started:
+            self._started = True
+            start = f"{CSI}?1049h" if self.alternate_screen else ""
+            self.output.write(f"{start}{CSI}?25l".encode())
+        data = self.encode(console).encode()
+        if data:
+            self.output.write(data)
+        self.output.flush()
+        self.bytes_written += len(data)
+        return len(data)
+
+    def close(self) -> None:
+        """restore the terminal"""
+        if self._started:
+            end = f"{CSI}?1049l" if self.alternate_screen else ""
+            self.output.write(f"{CSI}0m{CSI}?25h{end}".encode())
+            self.output.flush()
+            self._started = False
+        self._previous = None
@@ -0,0 +1,129 @@
+from __future__ import annotations
+from typing import List, Union
+
+
+class GapBuffer:
+    """GapBuffer is an editable text with a gap at the cursor position
+
+    Inserting or deleting text at the cursor is O(1) amortized, moving the
+    cursor is O(distance). It is the text model used by the editable widgets.
+
+    Args:
+        text: str: the initial text. The cursor is put at its end.
+        gap: int: the initial size of the gap
+    """
+
+    def __init__(self, text: str = "", gap: int = 64) -> None:
+        self._buf: List[str] = list(text) + [""]*gap
+        self._gap_start = len(text)
+        self._gap_end = len(self._buf)
+        self._text = text
+
+    def __len__(self) -> int:
+        return len(self._buf) - (self._gap_end - self._gap_start)
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._buf[:self._gap_start]) \
+                + "".join(self._buf[self._gap_end:])
+        return self._text
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self)!r})"
+
+    def __getitem__(self, key: Union[int, slice]) -> str:
+        if isinstance(key, int):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("GapBuffer index out of range")
+            return self._buf[self._physical(key)]
+
+        start, stop, step = key.indices(len(self))
+        if step != 1:
+            return str(self)[key]
+        gs, ge = self._gap_start, self._gap_end
+        before = self._buf[min(start, gs):min(stop, gs)]
+        after = self._buf[ge + max(start-gs, 0):ge + max(stop-gs, 0)]
+        return "".join(before) + "".join(after)
+
+    def _physical(self, i: int) -> int:
+        return i if i < self._gap_start \
+            else i + self._gap_end - self._gap_start
+
+    @property
+    def cursor(self) -> int:
+        return self._gap_start
+
+    @cursor.setter
+    def cursor(self, pos: int) -> None:
+        self.move(pos)
+
+    def move(self, pos: int) -> None:
+        """move the cursor, and so the gap, to pos"""
+        pos = sorted([0, pos, len(self)])[1]
+        gs, ge = self._gap_start, self._gap_end
+        if pos < gs:
+            n = gs - pos
+            self._buf[ge-n:ge] = self._buf[pos:gs]
+        elif pos > gs:
+            n = pos - gs
+            self._buf[gs:gs+n] = self._buf[ge:ge+n]
+        else:
+            return
+        self._gap_start = pos
+        self._gap_end = ge - (gs - pos)
+
+    def _grow(self, needed: int) -> None:
+        size = max(needed, len(self._buf), 64)
+        self._buf[self._gap_end:self._gap_end] = [""]*size
+        self._gap_end += size
+
+    def insert(self, text: str) -> None:
+        """insert text at the cursor and move the cursor after it"""
+        n = len(text)
+        if n > self._gap_end - self._gap_start:
+            self._grow(n)
+        self._buf[self._gap_start:self._gap_start+n] = text
+        self._gap_start += n
+        self._text = None
+
+    def delete(self, n: int = 1) -> str:
+        """delete up to n characters after the cursor
+
+        Returns:
+            str: the deleted text
+        """
+        n = min(n, len(self._buf) - self._gap_end)
+        deleted = "".join(self._buf[self._gap_end:self._gap_end+n])
+        self._gap_end += n
+        if n:
+            self._text = None
+        return deleted
+
+    def backspace(self, n: int = 1) -> str:
+        """delete up to n characters before the cursor
+
+        Returns:
+            str: the deleted text
+        """
+        n = min(n, self._gap_start)
+        deleted = "".join(self._buf[self._gap_start-n:self._gap_start])
+        self._gap_start -= n
+        if n:
+            self._text = None
+        return deleted
+
+    def line_start(self, pos: int) -> int:
+        """the index of the first character of the line containing pos"""
+        while pos > 0 and self._buf[self._physical(pos-1)] != "\n":
+            pos -= 1
+        return pos
+
+    def line_end(self, pos: int) -> int:
+        """the index of the line break ending the line containing pos, or
+        the length of the text for the last line"""
+        length = len(self)
+        while pos < length and self._buf[self._physical(pos)] != "\n":
+            pos += 1
+        return pos
@@ -1,12 +1,16 @@
 from __future__ import annotations
-from typing import Union
+from typing import Union, Optional, Sequence, Iterable, List, Dict, Any, \
+    Tuple
 from collections.abc import Mapping
 import time
+import numpy as np
 import tcod.event
-from tcodplus.canvas import Canvas
+from tcodplus.canvas import Canvas, Rect
 from tcodplus import event as tcp_event
-from tcodplus.interfaces import IUpdatable, IFocusable, IMouseFocusable, IKeyboardFocusable
-from tcodplus.style import Style
+from tcodplus.interfaces import IUpdatable, IFocusable, IMouseFocusable, \
+    IMaskFocusable, IKeyboardFocusable
+from tcodplus.style import Style, Border
+from tcodplus.text import GapBuffer
 
 
 ################
@@ -92,14 +96,62 @@ class BoxFocusable(BaseFocusable, IMouseFocusable):
         return is_in_x and is_in_y
 
 
-class KeyColorFocusable(BaseFocusable, IMouseFocusable):
+class KeyColorFocusable(BaseFocusable, IMaskFocusable):
+    """A focusable Canvas whose shape is given by the cells not drawn with the
+    key color of its style
+
+    The opacity mask used for hit-testing is only recomputed when the content
+    of the Canvas changed.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._mask = np.ones((0, 0), dtype=bool)
+        self._mask_key = None
+
+    def hit_mask(self) -> np.ndarray:
+        """get the opacity mask of the Canvas
+
+        Returns:
+            np.ndarray: a boolean array of shape (height, width) of the
+                geometry, True where the Canvas is opaque
+        """
+        style = self.styles()
+        key_color = style.key_color
+        width, height, c_width, c_height = self.geometry[4:8]
+        key = (id(self.console), self._content_version,
+               None if key_color is None else tuple(key_color),
+               style.border, self.geometry[4:8])
+        if key == self._mask_key:
+            return self._mask
+
+        if key_color is None:
+            mask = np.ones((height, width), dtype=bool)
+        else:
+            border = style.border != Border.NONE
+            mask = np.empty((height, width), dtype=bool)
+            if border:
+                border_bg = style.bg_color if style.border_bg_color is None \
+                    else style.border_bg_color
+                mask[:] = tuple(border_bg) != tuple(key_color)
+            c_height = min(c_height, self.console.height)
+            c_width = min(c_width, self.console.width)
+            content = mask[border:border+c_height, border:border+c_width]
+            content[:] = (self.console.bg[:c_height, :c_width]
+                          != key_color).any(axis=-1)
+
+        self._mask = mask
+        self._mask_key = key
+        return mask
+
     def mousefocus(self, event: tcod.event.MouseMotion) -> bool:
         mcx, mcy = event.tile
-        abs_x, abs_y = self.geometry[:3]
+        abs_x, abs_y, _, _, width, height = self.geometry[:6]
         m_rel_x = mcx - abs_x
         m_rel_y = mcy - abs_y
-
-        return self.console.bg[m_rel_y, m_rel_x] != self.key_color
+        if not (0 <= m_rel_x < width and 0 <= m_rel_y < height):
+            return False
+        return bool(self.hit_mask()[m_rel_y, m_rel_x])
 
 
 class BaseKeyboardFocusable(BaseFocusable, IKeyboardFocusable):
@@ -127,6 +179,16 @@ class BaseKeyboardFocusable(BaseFocusable, IKeyboardFocusable):
     def kbdfocus_requested(self, val: bool) -> None:
         self._kbdfocus_requested = val
 
+
+def _print_changed(console: tcod.console.Console, y: int, text: str) -> None:
+    """print text on the line y of console, padded with spaces, writing
+    only the characters that differ from the current content of the line"""
+    codes = np.full(console.width, ord(" "), dtype=console.ch.dtype)
+    text = text[:console.width]
+    codes[:len(text)] = [ord(c) for c in text]
+    changed = console.ch[y] != codes
+    console.ch[y, changed] = codes[changed]
+
 ####################
 # CONCRETE WIDGETS #
 ####################
@@ -163,6 +225,10 @@ class Tooltip(BaseUpdatable):
     def start_timer(self) -> None:
         self._last_time = time.perf_counter()
 
+    def is_opaque(self) -> bool:
+        # the alphas change while fading
+        return False
+
     def update(self) -> None:
         style = self.styles()
         has_border = style.border != 0
@@ -182,7 +248,7 @@ class Tooltip(BaseUpdatable):
         self.should_update = False
         self.force_redraw = True
 
-    def draw(self) -> None:
+    def draw(self, clip: Optional[Rect] = None) -> None:
         if self.value:
             dt = time.perf_counter() - self._last_time
             fade = 1.
@@ -197,7 +263,7 @@ class Tooltip(BaseUpdatable):
                 self.style.bg_alpha = bg_alpha * fade
                 self.style.fg_alpha = fg_alpha * fade
 
-                super().draw()
+                super().draw(clip)
                 self.style.bg_alpha = bg_alpha
                 self.style.fg_alpha = fg_alpha
 
@@ -243,10 +309,13 @@ class InputField(BoxFocusable, BaseKeyboardFocusable):
     def __init__(self, *args, value: str = "", max_len: int = 128,
                  **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self._value = value
+        self._buffer = GapBuffer(value)
         self.max_len = max_len
         self._pos = 0
         self._offset = 0
+        self._drawn_console = None
+        self._drawn_colors = None
+        self._drawn_pos = -1
 
         style = self.styles()
         if style.width == 0:
@@ -267,15 +336,15 @@ class InputField(BoxFocusable, BaseKeyboardFocusable):
             self.kbdfocus_requested = True
             self.should_update = True
 
-        def ev_keydown(event: tcod.event.KeyboardEvent) -> None:
-            def right():
-                if self._offset + self._pos == len(self._value):
-                    pass
-                elif self._pos == self.geometry.content_width-1:
-                    self._offset = self._offset+1
-                else:
-                    self._pos += 1
+        def right():
+            if self._offset + self._pos == len(self._buffer):
+                pass
+            elif self._pos == self.geometry.content_width-1:
+                self._offset = self._offset+1
+            else:
+                self._pos += 1
 
+        def ev_keydown(event: tcod.event.KeyboardEvent) -> None:
             if event.sym == tcod.event.K_LEFT:
                 if self._pos == 0:
                     self._offset = max(0, self._offset-1)
@@ -284,7 +353,7 @@ class InputField(BoxFocusable, BaseKeyboardFocusable):
             elif event.sym == tcod.event.K_RIGHT:
                 right()
             elif event.sym == tcod.event.K_END:
-                val_len = len(self.value)
+                val_len = len(self._buffer)
                 self._offset = max(0, val_len - self.geometry.content_width+1)
                 self._pos = val_len - self._offset
             elif event.sym == tcod.event.K_HOME:
@@ -292,9 +361,8 @@ class InputField(BoxFocusable, BaseKeyboardFocusable):
                 self._pos = 0
             elif event.sym == tcod.event.K_BACKSPACE:
                 if not self._pos == self._offset == 0:
-                    val = self.value
-                    ind = self._pos + self._offset
-                    self.value = val[:ind-1]+val[ind:]
+                    self._buffer.move(self._pos + self._offset)
+                    self._buffer.backspace()
 
                 if self._pos + self._offset == 0:
                     pass
@@ -303,27 +371,15 @@ class InputField(BoxFocusable, BaseKeyboardFocusable):
                 else:
                     self._pos -= 1
             elif event.sym == tcod.event.K_DELETE:
-                if self._offset + self._pos == len(self.value):
-                    pass
-                else:
-                    val = self.value
-                    ind = self._offset + self._pos
-                    self.value = val[:ind]+val[ind+1:]
+                self._buffer.move(self._offset + self._pos)
+                self._buffer.delete()
 
             self.should_update = True
 
         def ev_textinput(event: tcod.event.TextInput) -> None:
-            def right():
-                if self._offset + self._pos == len(self._value):
-                    pass
-                elif self._pos == self.geometry.content_width-1:
-                    self._offset = self._offset+1
-                else:
-                    self._pos += 1
-            if len(self.value) < self.max_len:
-                val = self.value
-                insert_ind = self._offset + self._pos
-                self.value = val[:insert_ind]+event.text+val[insert_ind:]
+            if len(self._buffer) < self.max_len:
+                self._buffer.move(self._offset + self._pos)
+                self._buffer.insert(event.text)
                 right()
                 self.should_update = True
 
@@ -335,29 +391,462 @@ class InputField(BoxFocusable, BaseKeyboardFocusable):
 
     @property
     def value(self) -> str:
-        return self._value
+        return str(self._buffer)
 
     @value.setter
     def value(self, val: str) -> None:
         self.should_update = True
-        self._value = val
+        self._buffer = GapBuffer(val)
+
+    def base_drawing(self) -> None:
+        # update() only redraws the cells that changed
+        pass
 
     def update(self) -> None:
         width = self.geometry.content_width
-        visible_value = self.value[self._offset:self._offset+width]
+        visible_value = self._buffer[self._offset:self._offset+width]
 
         # TODO: Better color scheme please
         style = self.styles()
         bg = style.bg_color * \
-            (0.75 if len(self.value) == self.max_len else 1)
+            (0.75 if len(self._buffer) == self.max_len else 1)
+        colors = (tuple(bg), tuple(style.fg_color))
 
-        self.console.clear(bg=bg, fg=style.fg_color)
-        self.console.print(0, 0, visible_value, bg=bg)
+        if self._drawn_console is not self.console \
+                or self._drawn_colors != colors:
+            self.console.clear(bg=bg, fg=style.fg_color)
+        elif 0 <= self._drawn_pos < self.console.width:
+            self.console.bg[0, self._drawn_pos] = bg
+            self.console.fg[0, self._drawn_pos] = style.fg_color
+        _print_changed(self.console, 0, visible_value)
 
         # TODO: Need something better here for opposite color
+        self._drawn_pos = -1
         if self.kbdfocus:
             self.console.bg[0, self._pos] = [255-col
                                              for col in style.bg_color]
             self.console.fg[0, self._pos] = [255-col
                                              for col in style.fg_color]
+            self._drawn_pos = self._pos
+
+        self._drawn_console = self.console
+        self._drawn_colors = colors
+        self.should_update = False
+
+
+class TextArea(BoxFocusable, BaseKeyboardFocusable):
+    """A multi-line editable text field
+
+    The text is stored in a GapBuffer so that typing is O(1) amortized
+    whatever the size of the text, and only the cells that changed since the
+    last update are redrawn.
+
+    Args:
+        value: str: the initial text
+        max_len: Optional[int]: the maximum number of characters. If None, the
+            text is unbounded
+    """
+
+    def __init__(self, *args, value: str = "",
+                 max_len: Optional[int] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._buffer = GapBuffer(value)
+        self._buffer.move(0)
+        self.max_len = max_len
+        self._top = 0  # index of the first character of the first line shown
+        self._left = 0
+        self._goal_col: Optional[int] = None
+        self._drawn_console = None
+        self._drawn_colors = None
+        self._drawn_cursor = (-1, -1)
+
+        def ev_mousebuttondown(event: tcod.event.MouseButtonEvent) -> None:
+            self.kbdfocus_requested = True
+            self.should_update = True
+
+        def ev_keydown(event: tcod.event.KeyboardEvent) -> None:
+            buf = self._buffer
+            pos = buf.cursor
+            goal_col = None
+            if event.sym == tcod.event.K_LEFT:
+                buf.move(pos-1)
+            elif event.sym == tcod.event.K_RIGHT:
+                buf.move(pos+1)
+            elif event.sym in (tcod.event.K_UP, tcod.event.K_DOWN):
+                start = buf.line_start(pos)
+                goal_col = self._goal_col if self._goal_col is not None \
+                    else pos - start
+                if event.sym == tcod.event.K_UP and start > 0:
+                    prev_start = buf.line_start(start-1)
+                    buf.move(min(prev_start + goal_col, start-1))
+                elif event.sym == tcod.event.K_DOWN:
+                    end = buf.line_end(pos)
+                    if end < len(buf):
+                        buf.move(min(end+1 + goal_col, buf.line_end(end+1)))
+            elif event.sym == tcod.event.K_HOME:
+                buf.move(buf.line_start(pos))
+            elif event.sym == tcod.event.K_END:
+                buf.move(buf.line_end(pos))
+            elif event.sym == tcod.event.K_BACKSPACE:
+                buf.backspace()
+            elif event.sym == tcod.event.K_DELETE:
+                buf.delete()
+            elif event.sym in (tcod.event.K_RETURN, tcod.event.K_KP_ENTER):
+                self.insert("\n")
+            self._goal_col = goal_col
+            self.should_update = True
+
+        def ev_textinput(event: tcod.event.TextInput) -> None:
+            self.insert(event.text)
+
+        self.focus_dispatcher.ev_mousebuttondown += [ev_mousebuttondown]
+        self.focus_dispatcher.ev_keydown += [ev_keydown]
+        self.focus_dispatcher.ev_textinput += [ev_textinput]
+
+    @property
+    def value(self) -> str:
+        return str(self._buffer)
+
+    @value.setter
+    def value(self, val: str) -> None:
+        self._buffer = GapBuffer(val)
+        self._buffer.move(0)
+        self._top = self._left = 0
+        self.should_update = True
+
+    def insert(self, text: str) -> None:
+        """insert text at the cursor position"""
+        if self.max_len is not None:
+            text = text[:max(0, self.max_len - len(self._buffer))]
+        if text:
+            self._buffer.insert(text)
+            self.should_update = True
+
+    def _scroll_to_cursor(self) -> Tuple[int, int]:
+        """scroll so that the cursor is visible
+
+        Returns:
+            Tuple[int, int]: the (x, y) position of the cursor in the console
+        """
+        buf = self._buffer
+        pos = buf.cursor
+        width, height = self.console.width, self.console.height
+        if pos < self._top:
+            self._top = buf.line_start(pos)
+
+        cursor_start = buf.line_start(pos)
+        rows = 0
+        start = self._top
+        while start < cursor_start:
+            start = buf.line_end(start) + 1
+            rows += 1
+        while rows >= height:
+            self._top = buf.line_end(self._top) + 1
+            rows -= 1
+
+        col = pos - cursor_start
+        if col < self._left:
+            self._left = col
+        elif col >= self._left + width:
+            self._left = col - width + 1
+        return col - self._left, rows
+
+    def base_drawing(self) -> None:
+        # update() only redraws the cells that changed
+        pass
+
+    def update(self) -> None:
+        style = self.styles()
+        colors = (tuple(style.bg_color), tuple(style.fg_color))
+        if self._drawn_console is not self.console \
+                or self._drawn_colors != colors:
+            self.console.clear(bg=style.bg_color, fg=style.fg_color)
+        else:
+            x, y = self._drawn_cursor
+            if 0 <= x < self.console.width and 0 <= y < self.console.height:
+                self.console.bg[y, x] = style.bg_color
+                self.console.fg[y, x] = style.fg_color
+
+        buf = self._buffer
+        cursor_x, cursor_y = self._scroll_to_cursor()
+        width, length = self.console.width, len(buf)
+        start = self._top
+        for y in range(self.console.height):
+            line = ""
+            if start <= length:
+                end = buf.line_end(start)
+                line = buf[min(start+self._left, end):
+                           min(start+self._left+width, end)]
+                start = end + 1
+            _print_changed(self.console, y, line)
+
+        self._drawn_cursor = (-1, -1)
+        if self.kbdfocus:
+            self.console.bg[cursor_y, cursor_x] = [255-col
+                                                   for col in style.bg_color]
+            self.console.fg[cursor_y, cursor_x] = [255-col
+                                                   for col in style.fg_color]
+            self._drawn_cursor = (cursor_x, cursor_y)
+
+        self._drawn_console = self.console
+        self._drawn_colors = colors
+        self.should_update = False
+
+
+class TableData:
+    """A columnar store for the rows displayed by a Table
+
+    Each column is kept in its own list so that a Table only touches the cells
+    of the rows it actually displays.
+
+    Args:
+        columns: Sequence[str]: the names of the columns
+    """
+
+    def __init__(self, columns: Sequence[str]) -> None:
+        self.columns: Dict[str, List[Any]] = {name: [] for name in columns}
+        self._len = 0
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def generation(self) -> int:
+        """Incremented each time existing rows are invalidated"""
+        return self._generation
+
+    def append(self, row: Union[Sequence[Any], Mapping]) -> None:
+        self.extend([row])
+
+    def extend(self, rows: Iterable[Union[Sequence[Any], Mapping]]) -> None:
+        """append rows, given either as sequences or as mappings of
+        column name to value. Missing values are stored as empty strings.
+        """
+        names = list(self.columns)
+        cols = [self.columns[name] for name in names]
+        n = 0
+        for row in rows:
+            if isinstance(row, Mapping):
+                row = [row.get(name, "") for name in names]
+            for col, val in zip(cols, row):
+                col.append(val)
+            for col in cols[len(row):]:
+                col.append("")
+            n += 1
+        self._len += n
+
+    def row(self, i: int) -> List[Any]:
+        return [col[i] for col in self.columns.values()]
+
+    def clear(self) -> None:
+        for col in self.columns.values():
+            col.clear()
+        self._len = 0
+        self._generation += 1
+
+
+class Table(BoxFocusable, BaseKeyboardFocusable):
+    """A virtualized table showing the rows of a TableData
+
+    Only the visible rows are drawn, directly into the Table console. When
+    scrolling, rows that stay visible are shifted in place and only the newly
+    exposed rows are rendered again with draw_row().
+
+    Args:
+        data: TableData: the rows to display
+        widths: Optional[Sequence[int]]: the width of each column. If None,
+            the content width is evenly split between the columns
+        header: bool: Wether or not the column names are displayed on the
+            first line
+    """
+
+    def __init__(self, *args, data: Optional[TableData] = None,
+                 widths: Optional[Sequence[int]] = None, header: bool = True,
+                 **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.data = data if data is not None else TableData(["value"])
+        self.widths = widths
+        self.header = header
+        self._top = 0
+        self._selected = -1
+
+        self._drawn_console = None
+        self._drawn_colors = None
+        self._drawn_generation = -1
+        self._drawn_len = -1
+        self._drawn_top = 0
+        self._slots: List[Optional[int]] = []
+
+        def ev_mousewheel(event: tcod.event.MouseWheel) -> None:
+            mv = (-1+event.flipped*2) * event.y
+            self.scroll_to(self._top + 3*mv)
+
+        def ev_mousebuttondown(event: tcod.event.MouseButtonEvent) -> None:
+            self.kbdfocus_requested = True
+            has_border = self.styles().border != Border.NONE
+            rel_y = event.tile[1] - self.geometry.abs_y - has_border \
+                - self.header
+            if 0 <= rel_y < self.body_height:
+                self.select(self._top + rel_y)
+
+        def ev_keydown(event: tcod.event.KeyboardEvent) -> None:
+            page = max(1, self.body_height - 1)
+            moves = {
+                tcod.event.K_UP: -1,
+                tcod.event.K_DOWN: 1,
+                tcod.event.K_PAGEUP: -page,
+                tcod.event.K_PAGEDOWN: page,
+            }
+            if event.sym in moves:
+                self.select(max(0, self._selected) + moves[event.sym])
+            elif event.sym == tcod.event.K_HOME:
+                self.select(0)
+            elif event.sym == tcod.event.K_END:
+                self.select(len(self.data)-1)
+
+        self.focus_dispatcher.ev_mousewheel += [ev_mousewheel]
+        self.focus_dispatcher.ev_mousebuttondown += [ev_mousebuttondown]
+        self.focus_dispatcher.ev_keydown += [ev_keydown]
+
+    @property
+    def should_update(self) -> bool:
+        # the TableData may change without the Table knowing it
+        return self._should_update \
+            or self._drawn_generation != self.data.generation \
+            or self._drawn_len != len(self.data)
+
+    @should_update.setter
+    def should_update(self, value: bool) -> None:
+        self._should_update = value
+
+    @property
+    def body_height(self) -> int:
+        return max(0, self.geometry.content_height - self.header)
+
+    @property
+    def top(self) -> int:
+        return self._top
+
+    @property
+    def selected(self) -> int:
+        return self._selected
+
+    def scroll_to(self, top: int) -> None:
+        top = sorted([0, top, max(0, len(self.data) - self.body_height)])[1]
+        if top != self._top:
+            self._top = top
+            self.should_update = True
+
+    def select(self, i: int) -> None:
+        """select the row i and scroll so that it is visible"""
+        if not len(self.data):
+            return
+        i = sorted([0, i, len(self.data)-1])[1]
+        if i < self._top:
+            self.scroll_to(i)
+        elif i >= self._top + self.body_height:
+            self.scroll_to(i - self.body_height + 1)
+        if i != self._selected:
+            self._selected = i
+            self.should_update = True
+
+    def column_widths(self) -> List[int]:
+        if self.widths is not None:
+            return list(self.widths)
+        n = len(self.data.columns)
+        width = self.geometry.content_width
+        return [(width - (n-1)) // n] * n
+
+    def base_drawing(self) -> None:
+        # Drawing is done row by row in update, only a new console or new
+        # colors need the console to be cleared.
+        style = self.styles()
+        if self._drawn_console is not self.console \
+                or self._drawn_colors != (tuple(style.bg_color),
+                                          tuple(style.fg_color)):
+            super().base_drawing()
+
+    def draw_row(self, y: int, i: int, selected: bool) -> None:
+        """draw the row i of the data at the line y of the console
+
+        This method can be overrode to customize how rows are rendered.
+        """
+        style = self.styles()
+        fg, bg = style.fg_color, style.bg_color
+        if selected:
+            fg, bg = tcod.Color(*[255-col for col in fg]), \
+                tcod.Color(*[255-col for col in bg])
+
+        values = self.data.row(i) if i >= 0 else list(self.data.columns)
+        self._print_cells(y, values, fg, bg)
+
+    def _print_cells(self, y: int, values: List[Any], fg: tcod.Color,
+                     bg: tcod.Color) -> None:
+        cells = []
+        seps = []
+        x = 0
+        for val, width in zip(values, self.column_widths()):
+            cells.append(f"{val!s:<{width}.{width}}")
+            x += width
+            seps.append(x)
+            x += 1
+        self.console.print(0, y, " ".join(cells), fg=fg, bg=bg)
+        seps = [x for x in seps[:-1] if x < self.console.width]
+        self.console.ch[y, seps] = 179
+
+    def _clear_row(self, y: int) -> None:
+        style = self.styles()
+        self.console.ch[y] = ord(" ")
+        self.console.fg[y] = style.fg_color
+        self.console.bg[y] = style.bg_color
+
+    def update(self) -> None:
+        body_h = self.body_height
+        # the rows may have been removed since the last drawing
+        self._top = sorted([0, self._top, max(0, len(self.data) - body_h)])[1]
+        self._selected = min(self._selected, len(self.data) - 1)
+        style = self.styles()
+        colors = (tuple(style.bg_color), tuple(style.fg_color))
+        full = self._drawn_console is not self.console \
+            or self._drawn_colors != colors \
+            or self._drawn_generation != self.data.generation \
+            or len(self._slots) != body_h
+        if full:
+            self.console.clear(bg=style.bg_color, fg=style.fg_color)
+            self._slots = [None] * body_h
+            if self.header:
+                self._print_cells(0, list(self.data.columns),
+                                  style.bg_color, style.fg_color)
+        else:
+            # recycle the rows that are still visible after a scroll
+            shift = self._top - self._drawn_top
+            if shift and abs(shift) < body_h:
+                h0 = self.header
+                src = slice(h0 + max(0, shift), h0 + body_h + min(0, shift))
+                dst = slice(h0 + max(0, -shift), h0 + body_h + min(0, -shift))
+                for arr in (self.console.ch, self.console.fg, self.console.bg):
+                    arr[dst] = arr[src].copy()
+                slots = self._slots[src.start-h0:src.stop-h0]
+                self._slots = [None]*max(0, -shift) + slots \
+                    + [None]*max(0, shift)
+
+        for s in range(body_h):
+            i = self._top + s
+            if i >= len(self.data):
+                i = None
+            state = None if i is None else (i, i == self._selected)
+            if self._slots[s] != state:
+                y = s + self.header
+                if i is None:
+                    self._clear_row(y)
+                else:
+                    self.draw_row(y, i, i == self._selected)
+                self._slots[s] = state
+
+        self._drawn_console = self.console
+        self._drawn_colors = colors
+        self._drawn_generation = self.data.generation
+        self._drawn_len = len(self.data)
+        self._drawn_top = self._top
         self.should_update = False